@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from create_fda_documentation import REQUIREMENT_TEXT_NORMALIZER
+
+# Test names built to trigger backtracking in the cleanup regexes, as a function of their length n
+ADVERSARIAL_NAMES = {
+    'digit run': lambda n: '1' * n + '_D_',
+    'digit runs (IP)': lambda n: ('1' * n + '_D_') * 3,
+    'short IP parts': lambda n: '_D_'.join(['12345'] * n),
+    'whitespace before slash': lambda n: 'A' + '_' * n + '_S_b',
+    'slashes': lambda n: 'A_S_' * n,
+    'slash words': lambda n: 'a_S_' + 'b_H_' * n + 'X',
+    'quotes': lambda n: 'A_Q_B' * n,
+    'unclosed quote': lambda n: 'A_Q_' + 'b' * n,
+    'endpoint dashes': lambda n: ' /a-' * n,
+    'long endpoint': lambda n: ' /' + 'a' * n + '-' + 'b' * n + ' ',
+    'camel case': lambda n: 'AbC' * n,
+}
+
+def time_normalize(text):
+    start = time.perf_counter()
+    REQUIREMENT_TEXT_NORMALIZER._normalize(text)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check that requirement text normalization stays linear on long and adversarial test names')
+    parser.add_argument('--length', type=int, default=5000, help='Size parameter of the adversarial names (default: 5000)')
+    parser.add_argument('--ceiling-ms', type=float, default=100.0, help='Maximum time to normalize one name, in ms (default: 100)')
+    parser.add_argument('--max-growth', type=float, default=3.0, help='Maximum time ratio when the name length doubles, 2 is linear (default: 3)')
+    parser.add_argument('--fuzz', type=int, default=2000, help='Number of random long names to fuzz (default: 2000)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the fuzzed names (default: 0)')
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'name':>24}  {'ms (n)':>8}  {'ms (2n)':>8}  {'growth':>6}")
+    for name, create_name in ADVERSARIAL_NAMES.items():
+        # best of 3 to keep scheduler noise out of the growth ratio
+        single = min(time_normalize(create_name(args.length)) for _ in range(3))
+        double = min(time_normalize(create_name(args.length * 2)) for _ in range(3))
+        growth = double / max(single, 1e-6)
+        print(f"{name:>24}  {single * 1000:>8.2f}  {double * 1000:>8.2f}  {growth:>6.2f}")
+        if double * 1000 > args.ceiling_ms:
+            failures.append(f"'{name}' took {double * 1000:.1f} ms, the ceiling is {args.ceiling_ms} ms")
+        # growth is only meaningful once the timing is above the timer noise
+        if growth > args.max_growth and double > 0.001:
+            failures.append(f"'{name}' grew {growth:.1f}x when its length doubled")
+
+    random.seed(args.seed)
+    atoms = ['A', 'b', '1', '23', '_', '_S_', '_Q_', '_H_', '_D_', '_d_', ' ', '-', '/', '"', 'Post', 'S3', 'Ios', 'Aws', 'Api']
+    slowest = (0, '')
+    for _ in range(args.fuzz):
+        text = ''.join(random.choice(atoms) for _ in range(random.randint(100, 2000)))
+        elapsed = time_normalize(text)
+        slowest = max(slowest, (elapsed, text))
+    print(f"Slowest of {args.fuzz} fuzzed names: {slowest[0] * 1000:.2f} ms ({len(slowest[1])} characters)")
+    if slowest[0] * 1000 > args.ceiling_ms:
+        failures.append(f"a fuzzed name took {slowest[0] * 1000:.1f} ms, the ceiling is {args.ceiling_ms} ms: {slowest[1]!r}")
+
+    for failure in failures:
+        print(f"  Error: {failure}")
+    sys.exit(1 if failures else 0)
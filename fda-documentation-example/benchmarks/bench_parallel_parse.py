@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from create_fda_documentation import CreateFDADocumentation
+from corpus import create_corpus
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark parse throughput of create_fda_documentation.py for 1 to N worker processes')
+    parser.add_argument('--files', type=int, default=2000, help='Number of synthetic test files (default: 2000)')
+    parser.add_argument('--tests-per-file', type=int, default=20, help='Number of tests per file (default: 20)')
+    parser.add_argument('--max-jobs', type=int, default=os.cpu_count() or 1, help='Largest worker count to benchmark (default: CPU count)')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='fda_bench_')
+    try:
+        create_corpus(root, ['golang'], files=args.files, tests_per_file=args.tests_per_file, non_test_ratio=0)
+        repo_path = os.path.join(root, 'golang')
+        baseline = None
+        print(f"{'jobs':>4}  {'seconds':>8}  {'files/s':>9}  {'speedup':>7}")
+        for jobs in range(1, args.max_jobs + 1):
+            fda = CreateFDADocumentation(jobs=jobs)
+            lang_config = fda.get_language_config('golang')
+            candidate_files = fda.get_candidate_files_for_language(repo_path, 'golang')
+            start = time.perf_counter()
+            # the same single read per file (test file detection and parsing) as a documentation run without the parse cache
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                test_files, requirements = fda.scan_test_files(candidate_files, lang_config)
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline = elapsed
+            assert len(requirements) == args.files * args.tests_per_file
+            print(f"{jobs:>4}  {elapsed:>8.3f}  {len(test_files) / elapsed:>9.1f}  {baseline / elapsed:>6.2f}x", flush=True)
+    finally:
+        shutil.rmtree(root)
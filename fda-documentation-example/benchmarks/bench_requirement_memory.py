@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from create_fda_documentation import CreateFDADocumentation, REQUIREMENT_TEXT_NORMALIZER
+from corpus import create_corpus
+
+class DictRequirement:
+    """A requirement stored the way it was before Requirement got __slots__: an attribute dict, lists of steps and
+    verifications, and its own copy of every string (each regex match created a new one)"""
+    def __init__(self, req):
+        self.req_text = copy_text(req.req_text)
+        self._req_orig_text = copy_text(req.req_orig_text)
+        self.test_steps = [copy_text(text) for text in req.test_steps]
+        self.test_verifications = [copy_text(text) for text in req.test_verifications]
+        # the path was shared by the requirements of a file, the file name was computed for every requirement
+        self.test_file_path = req.test_file_path
+        self.test_file_line = req.test_file_line
+        self.test_filename = os.path.basename(req.test_file_path)
+
+def copy_text(text):
+    return text.encode('utf-8').decode('utf-8')
+
+def measure(fda, lang_config, candidate_files, record):
+    """Scans the candidate files one at a time and keeps record(req) for every requirement.
+    Returns the records, the seconds taken and the retained and peak traced bytes."""
+    # the memoized texts of a previous run would otherwise be shared with this one
+    REQUIREMENT_TEXT_NORMALIZER.normalize.cache_clear()
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for entry in fda.scan_files(candidate_files, lang_config):
+            if entry is not None and entry['is_test_file']:
+                records.extend(record(req) for req in entry['requirements'])
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, elapsed, current, peak
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure the memory held by parsed requirements for a large synthetic corpus, compared with dict-based records')
+    parser.add_argument('--requirements', type=int, default=100000, help='Number of synthetic requirements (default: 100000)')
+    parser.add_argument('--tests-per-file', type=int, default=50, help='Number of tests per file (default: 50)')
+    parser.add_argument('--min-reduction', type=float, default=0.30,
+                        help='Fail when the slotted records do not use at least this fraction fewer bytes per requirement (default: 0.30)')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='fda_bench_')
+    try:
+        create_corpus(root, ['golang'], files=max(1, args.requirements // args.tests_per_file), tests_per_file=args.tests_per_file, non_test_ratio=0)
+        fda = CreateFDADocumentation()
+        lang_config = fda.get_language_config('golang')
+        candidate_files = fda.get_candidate_files_for_language(os.path.join(root, 'golang'), 'golang')
+        results = {}
+        for name, record in [('slotted', lambda req: req), ('dict', DictRequirement)]:
+            records, elapsed, current, peak = measure(fda, lang_config, candidate_files, record)
+            results[name] = (len(records), elapsed, current, peak)
+            del records
+    finally:
+        shutil.rmtree(root)
+
+    count = results['slotted'][0]
+    print(f"requirements: {count}")
+    print(f"{'':>18}  {'slotted':>9}  {'dict':>9}  {'reduction':>9}")
+    rows = [('parse seconds', 1, 1, '.3f'), ('retained MB', 2, 1e6, '.1f'), ('peak MB', 3, 1e6, '.1f'), ('bytes/requirement', 2, max(1, count), '.0f')]
+    for label, index, divisor, spec in rows:
+        slotted, dict_based = results['slotted'][index] / divisor, results['dict'][index] / divisor
+        # the parse time includes the tracing overhead, only the memory is compared
+        reduction = f"{(1 - slotted / dict_based) * 100:.0f}%" if index > 1 else ''
+        print(f"{label:>18}  {slotted:>9{spec}}  {dict_based:>9{spec}}  {reduction:>9}")
+
+    reduction = 1 - results['slotted'][2] / results['dict'][2]
+    if reduction < args.min_reduction:
+        print(f"Error: the slotted records use {reduction * 100:.0f}% fewer bytes per requirement, expected at least {args.min_reduction * 100:.0f}%")
+        sys.exit(1)
+    print(f"The slotted records use {reduction * 100:.0f}% fewer bytes per requirement (at least {args.min_reduction * 100:.0f}% expected)")
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import contextlib
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from create_fda_documentation import CreateFDADocumentation, Section
+from corpus import create_corpus
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Templates')
+
+TESTS_PER_FILE = 20
+
+def read_sections(fda, repo_path, section_count):
+    """Returns the requirements of the corpus repo at repo_path, spread over section_count sections"""
+    lang_config = fda.get_language_config('golang')
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        requirements = fda.scan_test_files(fda.get_candidate_files_for_language(repo_path, 'golang'), lang_config)[1]
+    sections = []
+    per_section = max(1, -(-len(requirements) // section_count))
+    for section_i in range(0, len(requirements), per_section):
+        section = Section()
+        section.name = f'Section {len(sections)}'
+        section.requirements = requirements[section_i:section_i + per_section]
+        sections.append(section)
+    return sections
+
+def run_once(stream_output, repo_path, section_count, output_dir):
+    """Writes both documents in this process and prints seconds and peak RSS"""
+    fda = CreateFDADocumentation(stream_output=stream_output)
+    sections = read_sections(fda, repo_path, section_count)
+    fda.assign_requirement_numbers(sections)
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        fda.create_requirements_document(sections, 'BEN', os.path.join(TEMPLATE_DIR, 'Software Requirements Specification - Backend.docx'), os.path.join(output_dir, 'srs.docx'))
+        fda.create_verification_document(sections, 'BEN', os.path.join(TEMPLATE_DIR, 'Verification Protocol - Backend.docx'), os.path.join(output_dir, 'ver.docx'))
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed:.2f} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare time and peak memory of in-memory and streamed document output')
+    parser.add_argument('--requirements', type=int, default=50000, help='Number of synthetic requirements (default: 50000)')
+    parser.add_argument('--sections', type=int, default=50, help='Number of sections they are spread over (default: 50)')
+    parser.add_argument('--run-once', choices=['dom', 'stream'], help=argparse.SUPPRESS)
+    parser.add_argument('--output-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--repo-path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_once:
+        run_once(args.run_once == 'stream', args.repo_path, args.sections, args.output_dir)
+        sys.exit(0)
+
+    corpus_root = tempfile.mkdtemp(prefix='fda_bench_')
+    create_corpus(corpus_root, ['golang'], files=max(1, args.requirements // TESTS_PER_FILE), tests_per_file=TESTS_PER_FILE, non_test_ratio=0)
+    try:
+        # every mode runs in a fresh process, so the peak RSS of one does not hide the other
+        print(f"{'mode':>8}  {'seconds':>8}  {'peak MB':>8}  {'output MB':>9}")
+        for mode in ['dom', 'stream']:
+            with tempfile.TemporaryDirectory(prefix='fda_bench_') as output_dir:
+                result = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-once', mode, '--output-dir', output_dir,
+                    '--repo-path', os.path.join(corpus_root, 'golang'), '--sections', str(args.sections)], capture_output=True, text=True, check=True)
+                elapsed, peak_mb = result.stdout.split()
+                output_mb = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir)) / 1e6
+                print(f"{mode:>8}  {float(elapsed):>8.2f}  {float(peak_mb):>8.0f}  {output_mb:>9.1f}", flush=True)
+    finally:
+        shutil.rmtree(corpus_root)
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from create_fda_documentation import CreateFDADocumentation
+from corpus import create_corpus
+
+def time_detection(fda, lang_config, candidate_files, repeat):
+    """Returns the best time to scan all candidate files as a documentation run does (reading only the start of a
+    file that is not a test file, parsing the test files), and the number of test files found"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        test_files = [entry for entry in fda.scan_files(candidate_files, lang_config) if entry is not None and entry['is_test_file']]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(test_files)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark test file detection over a synthetic tree of mostly non-test files')
+    parser.add_argument('--files', type=int, default=5000, help='Number of synthetic candidate files (default: 5000)')
+    parser.add_argument('--test-ratio', type=float, default=0.05, help='Fraction of candidate files that are test files (default: 0.05)')
+    parser.add_argument('--lines', type=int, default=300, help='Lines per non-test file (default: 300)')
+    parser.add_argument('--tests-per-file', type=int, default=10, help='Tests per test file (default: 10)')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed repetitions, the best one is reported (default: 3)')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='fda_bench_')
+    try:
+        test_file_count = max(1, round(args.files * args.test_ratio))
+        create_corpus(root, ['typescript'], files=test_file_count, tests_per_file=args.tests_per_file,
+                      non_test_ratio=(args.files - test_file_count) / test_file_count, source_lines=args.lines)
+        repo_path = os.path.join(root, 'typescript')
+        fda = CreateFDADocumentation()
+        candidate_files = fda.get_candidate_files_for_language(repo_path, 'typescript')
+        print(f"{'strategy':>16}  {'seconds':>8}  {'files/s':>9}  {'test files':>10}")
+        for strategy, limit in [('lines', 50), ('prefix', 8192), ('prefix', 4096), ('prefix', 1024)]:
+            lang_config = dict(fda.get_language_config('typescript'), test_detection_strategy=strategy, test_detection_limit=limit)
+            elapsed, test_file_count = time_detection(fda, lang_config, candidate_files, args.repeat)
+            print(f"{strategy + ' ' + str(limit):>16}  {elapsed:>8.3f}  {len(candidate_files) / elapsed:>9.1f}  {test_file_count:>10}", flush=True)
+    finally:
+        shutil.rmtree(root)
@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from create_fda_documentation import Requirement, RequirementTextNormalizer
+
+DEFAULT_GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'normalization_golden.jsonl')
+
+def read_golden(golden_path):
+    """Returns the (test name, expected requirement text) pairs of the golden file"""
+    with open(golden_path, 'r', encoding='utf-8') as file:
+        return [(record['name'], record['text']) for record in map(json.loads, file)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check that requirement text normalization gives the texts recorded in the golden file')
+    parser.add_argument('--golden', default=DEFAULT_GOLDEN, help='Golden file (default: benchmarks/normalization_golden.jsonl)')
+    parser.add_argument('--update', action='store_true', help='Rewrite the expected texts with the current output, after an intended change of the conversions or cleanups')
+    args = parser.parse_args()
+
+    golden = read_golden(args.golden)
+    # a fresh normalizer, so every name goes through the conversions and cleanups instead of the memo
+    normalizer = RequirementTextNormalizer(Requirement.CONVERSIONS, Requirement.CLEANUPS)
+    if args.update:
+        with open(args.golden, 'w', encoding='utf-8') as file:
+            for name, _ in golden:
+                file.write(json.dumps({'name': name, 'text': normalizer._normalize(name)}, ensure_ascii=False) + '\n')
+        print(f"Golden file {args.golden} updated")
+        sys.exit(0)
+
+    mismatches = 0
+    for name, expected in golden:
+        # the memoized path used while parsing has to agree as well
+        req = Requirement()
+        req.req_orig_text = name
+        for text in (normalizer._normalize(name), req.req_text):
+            if text != expected:
+                mismatches += 1
+                print(f"  Error: {name!r} gives {text!r}, expected {expected!r}")
+                break
+    if mismatches:
+        print(f"{mismatches} of {len(golden)} test names do not match the golden file")
+        sys.exit(1)
+    print(f"All {len(golden)} test names match the golden file")
@@ -0,0 +1,119 @@
+import os
+import random
+import argparse
+
+from docx import Document
+
+LANGUAGES = ['golang', 'swift', 'python', 'javascript', 'typescript', 'java', 'csharp', 'dart']
+
+WORDS = ['user', 'login', 'request', 'response', 'token', 'session', 'record', 'device', 'patient', 'alarm', 'reading',
+         'endpoint', 'screen', 'button', 'error', 'message', 'value', 'limit', 'sensor', 'report', 'export', 'upload']
+
+# per language: test file extension, file header, the lines opening a test (given the test name), comment prefix, the line closing a test, file footer
+LANGUAGE_SYNTAX = {
+    'golang': ('.go', ['package tests', '', 'import "testing"', ''], lambda name: [f'func Test_{camel(name)}(t *testing.T) {{'], '\t//', '}', []),
+    'swift': ('.swift', ['import XCTest', '', 'final class GeneratedTests: XCTestCase {'], lambda name: [f'    func test_{camel(name)}() throws {{'], '        //', '    }', ['}']),
+    'python': ('.py', ['import unittest', '', 'class GeneratedTests(unittest.TestCase):'], lambda name: [f'    def test_{camel(name)}(self):'], '        #', '        pass', []),
+    'javascript': ('.js', ["const { expect } = require('chai');", '', "describe('generated', () => {"], lambda name: [f"  it('{name}', () => {{"], '    //', '  });', ['});']),
+    'typescript': ('.ts', ["import { describe, it, expect } from 'jest';", '', "describe('generated', () => {"], lambda name: [f"  it('{name}', () => {{"], '    //', '  });', ['});']),
+    'java': ('.java', ['import org.junit.jupiter.api.Test;', '', 'class GeneratedTest {'], lambda name: ['    @Test', f'    public void {camel(name, upper_first=False)}() {{'], '        //', '    }', ['}']),
+    'csharp': ('.cs', ['using NUnit.Framework;', '', 'public class GeneratedTests {'], lambda name: ['    [Test]', f'    public void Test{camel(name)}() {{'], '        //', '    }', ['}']),
+    'dart': ('.dart', ["import 'package:test/test.dart';", '', 'void main() {'], lambda name: [f"  test('{name}', () {{"], '    //', '  });', ['}']),
+}
+
+def camel(name, upper_first=True):
+    words = name.split()
+    text = ''.join(word.capitalize() for word in words)
+    return text if upper_first else text[:1].lower() + text[1:]
+
+def test_name(rng, name_words):
+    return ' '.join(['when the'] + [rng.choice(WORDS) for _ in range(max(1, name_words - 2))] + ['shall be handled'])
+
+def create_test_file(path, language, rng, tests_per_file, steps, verifications, name_words):
+    ext, header, open_test, comment, close_test, footer = LANGUAGE_SYNTAX[language]
+    lines = list(header)
+    for _ in range(tests_per_file):
+        lines += open_test(test_name(rng, name_words))
+        for step_i in range(steps):
+            lines.append(f'{comment} S{step_i + 1}: Send the {rng.choice(WORDS)} {rng.choice(WORDS)} to the /api/{rng.choice(WORDS)} endpoint')
+        for ver_i in range(verifications):
+            lines.append(f'{comment} V{ver_i + 1}: Verify that the {rng.choice(WORDS)} {rng.choice(WORDS)} is returned')
+        lines.append(close_test)
+        lines.append('')
+    lines += footer
+    with open(path, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
+
+def create_templates(template_dir):
+    """Writes minimal SRS and verification protocol templates: the verification table has a header and one empty row"""
+    os.makedirs(template_dir, exist_ok=True)
+    srs = Document()
+    srs.add_heading('Software Requirements Specification', level=0)
+    srs_path = os.path.join(template_dir, 'srs-template.docx')
+    srs.save(srs_path)
+    ver = Document()
+    ver.add_heading('Verification Protocol', level=0)
+    ver.add_paragraph('Section')
+    table = ver.add_table(rows=2, cols=3)
+    for cell, text in zip(table.rows[0].cells, ['Step', 'Test Steps', 'Expected Results']):
+        cell.text = text
+    ver_path = os.path.join(template_dir, 'ver-template.docx')
+    ver.save(ver_path)
+    return srs_path, ver_path
+
+def create_corpus(root, languages=LANGUAGES, files=100, tests_per_file=20, steps=2, verifications=2, name_words=8, non_test_ratio=1.0, seed=1, source_lines=100):
+    """Writes one synthetic repo per language under root (in root/<language>), with templates and a config.yaml covering
+    all of them. Every repo has files test files spread over a few directories and non_test_ratio times as many non-test
+    files of source_lines lines. Returns the path of the config file."""
+    rng = random.Random(seed)
+    srs_path, ver_path = create_templates(os.path.join(root, 'Templates'))
+    config_lines = []
+    for language in languages:
+        ext = LANGUAGE_SYNTAX[language][0]
+        repo_path = os.path.join(root, language)
+        sub_dirs = ['core', 'api/handlers', 'ui/screens', 'misc']
+        for sub_dir in sub_dirs:
+            os.makedirs(os.path.join(repo_path, sub_dir), exist_ok=True)
+        for file_i in range(files):
+            sub_dir = sub_dirs[file_i % len(sub_dirs)]
+            create_test_file(os.path.join(repo_path, sub_dir, f'file_{file_i}_test{ext}'), language, rng, tests_per_file, steps, verifications, name_words)
+        for file_i in range(int(files * non_test_ratio)):
+            with open(os.path.join(repo_path, sub_dirs[file_i % len(sub_dirs)], f'source_{file_i}{ext}'), 'w') as file:
+                file.write('\n'.join(f'// source line {line_i} of a file that is not a test' for line_i in range(source_lines)) + '\n')
+        config_lines += [
+            f'{language}_repo:',
+            f'  repo_path: "{repo_path}"',
+            f'  req_template_path: "{srs_path}"',
+            f'  req_output_name: "{language}-srs.docx"',
+            f'  ver_template_path: "{ver_path}"',
+            f'  ver_output_name: "{language}-ver.docx"',
+            f'  tag: {language[:3].upper()}',
+            f'  language: {language}',
+            '  sections:',
+            '    - display_name: "Core"',
+            '      path_key: "core"',
+            f'      filenames: [{", ".join(f"file_{file_i}_test{ext}" for file_i in range(0, files, len(sub_dirs)))}]',
+            '    - display_name: "API"',
+            f'      filenames: [{", ".join(f"file_{file_i}_test{ext}" for file_i in range(1, files, len(sub_dirs)))}]',
+            '',
+        ]
+    config_path = os.path.join(root, 'config.yaml')
+    with open(config_path, 'w') as file:
+        file.write('\n'.join(config_lines))
+    return config_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write a synthetic multi-language test corpus with its config.yaml and templates')
+    parser.add_argument('output_dir', help='Directory the corpus is written to')
+    parser.add_argument('--languages', nargs='+', default=LANGUAGES, choices=LANGUAGES, help='Languages to generate a repo for (default: all)')
+    parser.add_argument('--files', type=int, default=100, help='Test files per language (default: 100)')
+    parser.add_argument('--tests-per-file', type=int, default=20, help='Tests per file (default: 20)')
+    parser.add_argument('--steps', type=int, default=2, help='S: comments per test (default: 2)')
+    parser.add_argument('--verifications', type=int, default=2, help='V: comments per test (default: 2)')
+    parser.add_argument('--name-words', type=int, default=8, help='Words per test name (default: 8)')
+    parser.add_argument('--non-test-ratio', type=float, default=1.0, help='Non-test files per test file (default: 1.0)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--source-lines', type=int, default=100, help='Lines per non-test file (default: 100)')
+    args = parser.parse_args()
+    config_path = create_corpus(args.output_dir, args.languages, args.files, args.tests_per_file, args.steps, args.verifications, args.name_words, args.non_test_ratio, args.seed, args.source_lines)
+    print(f"Wrote corpus, run it with: python {os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'create_fda_documentation.py')} -c {config_path}")
@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from create_fda_documentation import CreateFDADocumentation, Requirement, RequirementTextNormalizer, REQUIREMENT_TEXT_NORMALIZER
+from corpus import LANGUAGES, create_corpus
+
+PHASES = ['discovery', 'parse', 'normalize', 'srs_render', 'ver_render']
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+def best_of(repeat, function):
+    """Runs function repeat times with its output silenced, returns the fastest time and the last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            result = function()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def parse(fda, candidate_files, lang_config):
+    # the normalizer memoizes test names, a warm cache would hide the normalization done while parsing
+    REQUIREMENT_TEXT_NORMALIZER.normalize.cache_clear()
+    return fda.scan_test_files(candidate_files, lang_config)[1]
+
+def normalize(requirements):
+    # a fresh normalizer without its memo, so every test name is normalized once per repetition
+    normalizer = RequirementTextNormalizer(Requirement.CONVERSIONS, Requirement.CLEANUPS)
+    return [normalizer._normalize(req.req_orig_text) for req in requirements]
+
+def benchmark_language(config_path, language, repeat, output_dir):
+    """Returns the best time of every phase for the repo of language, and its number of requirements"""
+    fda = CreateFDADocumentation(config_file_path=config_path, use_cache=False)
+    repo_name = f'{language}_repo'
+    repo_config = fda.config[repo_name]
+    lang_config = fda.get_language_config(language)
+    tag = repo_config['tag']
+    times = {}
+
+    times['discovery'], candidate_files = best_of(repeat, lambda: fda.get_candidate_files_for_language(repo_config['repo_path'], language))
+    times['parse'], requirements = best_of(repeat, lambda: parse(fda, candidate_files, lang_config))
+    times['normalize'], _ = best_of(repeat, lambda: normalize(requirements))
+
+    # both renders work on the same classified and numbered sections
+    sections = fda.get_sections_for_repo(repo_name)
+    for req in requirements:
+        fda.get_section_for_requirement(req, sections).requirements.append(req)
+    fda.assign_requirement_numbers(sections)
+    times['srs_render'], _ = best_of(repeat, lambda: fda.create_requirements_document(sections, tag, repo_config['req_template_path'], os.path.join(output_dir, repo_config['req_output_name'])))
+    times['ver_render'], _ = best_of(repeat, lambda: fda.create_verification_document(sections, tag, repo_config['ver_template_path'], os.path.join(output_dir, repo_config['ver_output_name'])))
+    return times, len(requirements)
+
+def compare(results, baseline, threshold, min_seconds):
+    """Returns the (language, phase, baseline seconds, seconds) that are more than threshold slower than the baseline"""
+    regressions = []
+    for language, times in results.items():
+        for phase, seconds in times.items():
+            base = baseline.get(language, {}).get(phase)
+            if base is None:
+                continue
+            # phases that only take a few milliseconds are too noisy for a relative threshold
+            if seconds > base * (1 + threshold) and seconds - base > min_seconds:
+                regressions.append((language, phase, base, seconds))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time discovery, parsing, normalization and both renders on a synthetic corpus and compare them with stored baselines')
+    parser.add_argument('--languages', nargs='+', default=LANGUAGES, choices=LANGUAGES, help='Languages to benchmark (default: all)')
+    parser.add_argument('--files', type=int, default=100, help='Test files per language (default: 100)')
+    parser.add_argument('--tests-per-file', type=int, default=20, help='Tests per file (default: 20)')
+    parser.add_argument('--steps', type=int, default=2, help='S: comments per test (default: 2)')
+    parser.add_argument('--verifications', type=int, default=2, help='V: comments per test (default: 2)')
+    parser.add_argument('--name-words', type=int, default=8, help='Words per test name (default: 8)')
+    parser.add_argument('--non-test-ratio', type=float, default=1.0, help='Non-test files per test file (default: 1.0)')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed repetitions, the best one is reported (default: 3)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline file (default: benchmarks/baselines.json)')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the results as the new baseline instead of comparing with it')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Fraction a phase may be slower than its baseline before the run fails (default: 0.25)')
+    parser.add_argument('--min-seconds', type=float, default=0.005, help='Slowdowns smaller than this are never regressions (default: 0.005)')
+    args = parser.parse_args()
+
+    corpus = {'files': args.files, 'tests_per_file': args.tests_per_file, 'steps': args.steps, 'verifications': args.verifications,
+              'name_words': args.name_words, 'non_test_ratio': args.non_test_ratio}
+    baseline = None
+    if not args.update_baseline:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}, record one with --update-baseline")
+        else:
+            with open(args.baseline, 'r') as file:
+                baseline = json.load(file)
+            if baseline.get('corpus') != corpus:
+                raise Exception(f"Baseline {args.baseline} was recorded for corpus {baseline.get('corpus')}, not {corpus}. Rerun with its options or --update-baseline.")
+
+    root = tempfile.mkdtemp(prefix='fda_bench_')
+    try:
+        config_path = create_corpus(os.path.join(root, 'corpus'), args.languages, seed=1, **corpus)
+        output_dir = os.path.join(root, 'output')
+        os.makedirs(output_dir)
+        results = {}
+        print(f"{'language':>10}  {'reqs':>6}  " + '  '.join(f'{phase:>10}' for phase in PHASES))
+        for language in args.languages:
+            results[language], requirement_count = benchmark_language(config_path, language, args.repeat, output_dir)
+            print(f"{language:>10}  {requirement_count:>6}  " + '  '.join(f'{results[language][phase]:>10.4f}' for phase in PHASES), flush=True)
+    finally:
+        shutil.rmtree(root)
+
+    if args.update_baseline:
+        # languages that were not benchmarked this time keep their baseline
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as file:
+                previous = json.load(file)
+        languages = previous.get('languages', {}) if previous.get('corpus') == corpus else {}
+        languages.update(results)
+        with open(args.baseline, 'w') as file:
+            json.dump({'corpus': corpus, 'languages': languages}, file, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    if baseline is None:
+        sys.exit(0)
+    regressions = compare(results, baseline['languages'], args.threshold, args.min_seconds)
+    for language, phase, base, seconds in regressions:
+        print(f"Regression: {language} {phase} took {seconds:.4f}s, baseline {base:.4f}s (+{(seconds / base - 1) * 100:.0f}%)")
+    if regressions:
+        sys.exit(1)
+    print(f"No phase is more than {args.threshold * 100:.0f}% slower than the baseline")
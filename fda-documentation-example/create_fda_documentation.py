@@ -1,127 +1,1686 @@
 import os
+import sys
 import re
+import abc
+import json
 import yaml
+import time
+import pickle
+import hashlib
+import inspect
+import fnmatch
+import cProfile
+import csv
+import html
 import argparse
+import signal
+import threading
+import contextlib
+import zipfile
+import subprocess
+import multiprocessing
 from copy import deepcopy
-from docx import Document
-from docx.shared import Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
+from functools import lru_cache
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+# python-docx and lxml are imported where the documents are built, so --check runs without loading them
+
+# Built-in language specs. Patterns are kept as strings and compiled by LanguageRegistry on first use,
+# config.yaml can add languages or override single keys of these under a top-level 'languages' key.
+LANGUAGE_SPECS = {
+    'golang': {
+        'test_file_ext': '.go',
+        'regex_requirement': [
+            r'^func\s+Test_*(.+)\(t\s+\*testing.T\)',
+        ],
+        'regex_test_step': r'\s+//\s*(S\d+:\s*.+)',
+        'regex_test_ver': r'\s+//\s*(V\d+:\s*.+)',
+        'requirement_group': 1,
+        'requirement_lookahead_triggers': [],
+        'test_detection_strategy': 'prefix',
+        'test_detection_limit': 8192,
+        'test_import_patterns': [
+            r'^\s*import\s+"testing"',
+            r'^\s*import\s+\(\s*.*"testing".*\)',
+            r'^\s*"testing"'
+        ]
+    },
+    'swift': {
+        'test_file_ext': '.swift',
+        'regex_requirement': [
+            r'\s+func\s+test_*(.+)\(\).+\{',
+        ],
+        'regex_test_step': r'\s+//\s*(S\d+:\s*.+)',
+        'regex_test_ver': r'\s+//\s*(V\d+:\s*.+)',
+        'requirement_group': 1,
+        'requirement_lookahead_triggers': [],
+        'test_detection_strategy': 'prefix',
+        'test_detection_limit': 8192,
+        'test_import_patterns': [
+            r'^\s*import\s+XCTest',
+            r'^\s*@testable\s+import',
+            r'class\s+\w+.*:\s*XCTestCase'
+        ]
+    },
+    'python': {
+        'test_file_ext': '.py',
+        'regex_requirement': [
+            r'^\s*def\s+test_*(.+)\(',
+            r'^\s*def\s+test(.+)\('
+        ],
+        'regex_test_step': r'\s*#\s*(S\d+:\s*.+)',
+        'regex_test_ver': r'\s*#\s*(V\d+:\s*.+)',
+        'requirement_group': 1,
+        'requirement_lookahead_triggers': [],
+        'test_detection_strategy': 'prefix',
+        'test_detection_limit': 8192,
+        'test_import_patterns': [
+            r'^\s*import\s+unittest',
+            r'^\s*from\s+unittest',
+            r'^\s*import\s+pytest',
+            r'^\s*from\s+pytest',
+            r'class\s+\w+.*\(.*unittest\.TestCase.*\)'
+        ]
+    },
+    'javascript': {
+        'test_file_ext': '.js',
+        'regex_requirement': [
+            r'^\s*(it|test)\(\s*[\'"](.+?)[\'"]',
+            r'^\s*(it|test)\s*\(\s*[\'"](.+?)[\'"]'
+        ],
+        'regex_test_step': r'\s*//\s*(S\d+:\s*.+)',
+        'regex_test_ver': r'\s*//\s*(V\d+:\s*.+)',
+        'requirement_group': 2,
+        'requirement_lookahead_triggers': [],
+        'test_detection_strategy': 'prefix',
+        'test_detection_limit': 8192,
+        'test_import_patterns': [
+            r'^\s*(import|require).*[\'"]jest[\'"]',
+            r'^\s*(import|require).*[\'"]mocha[\'"]',
+            r'^\s*(import|require).*[\'"]chai[\'"]',
+            r'^\s*describe\s*\(',
+            r'^\s*(it|test)\s*\('
+        ]
+    },
+    'typescript': {
+        'test_file_ext': '.ts',
+        'regex_requirement': [
+            r'^\s*(it|test)\(\s*[\'"](.+?)[\'"]',
+            r'^\s*(it|test)\s*\(\s*[\'"](.+?)[\'"]'
+        ],
+        'regex_test_step': r'\s*//\s*(S\d+:\s*.+)',
+        'regex_test_ver': r'\s*//\s*(V\d+:\s*.+)',
+        'requirement_group': 2,
+        'requirement_lookahead_triggers': [],
+        'test_detection_strategy': 'prefix',
+        'test_detection_limit': 8192,
+        'test_import_patterns': [
+            r'^\s*import.*[\'"]jest[\'"]',
+            r'^\s*import.*[\'"]mocha[\'"]',
+            r'^\s*import.*[\'"]chai[\'"]',
+            r'^\s*describe\s*\(',
+            r'^\s*(it|test)\s*\('
+        ]
+    },
+    'java': {
+        'test_file_ext': '.java',
+        'regex_requirement': [
+            r'^\s*@DisplayName\(\s*[\'"](.+?)[\'"]\s*\)\s*',
+            r'^\s*@Test\s*\n\s*public\s+void\s+(.+?)\(',
+            r'^\s*void\s+test_*(.+?)\('
+        ],
+        'regex_test_step': r'\s*//\s*(S\d+:\s*.+)',
+        'regex_test_ver': r'\s*//\s*(V\d+:\s*.+)',
+        'requirement_group': 1,
+        'requirement_lookahead_triggers': [],
+        'test_detection_strategy': 'prefix',
+        'test_detection_limit': 8192,
+        'test_import_patterns': [
+            r'^\s*import\s+org\.junit',
+            r'^\s*import\s+org\.testng',
+            r'^\s*@Test',
+            r'^\s*@BeforeEach',
+            r'^\s*@AfterEach'
+        ]
+    },
+    'csharp': {
+        'test_file_ext': '.cs',
+        'regex_requirement': [
+            r'^\s*\[Test\]\s*\n\s*public\s+void\s+Test(.+?)\(',
+            r'^\s*\[Test\]\s*public\s+void\s+Test(.+?)\(',
+            r'^\s*\[TestMethod\]\s*\n\s*public\s+void\s+(.+?)\(',
+            r'^\s*\[Fact\]\s*\n\s*public\s+void\s+(.+?)\('
+        ],
+        'regex_test_step': r'\s*//\s*(S\d+:\s*.+)',
+        'regex_test_ver': r'\s*//\s*(V\d+:\s*.+)',
+        'requirement_group': 1,
+        'requirement_lookahead_triggers': [],
+        'test_detection_strategy': 'prefix',
+        'test_detection_limit': 8192,
+        'test_import_patterns': [
+            r'^\s*using\s+NUnit\.Framework',
+            r'^\s*using\s+Microsoft\.VisualStudio\.TestTools',
+            r'^\s*using\s+Xunit',
+            r'^\s*\[Test\]',
+            r'^\s*\[TestMethod\]',
+            r'^\s*\[Fact\]'
+        ]
+    },
+    'dart': {
+        'test_file_ext': '.dart',
+        'regex_requirement': [
+            r'^\s*test\(\s*[\'"](.+?)[\'"]',
+            r'^\s*testWidgets\(\s*[\'"](.+?)[\'"]',
+            r'^\s*blocTest<.+?>\s*\(\s*[\'"](.+?)[\'"]'
+        ],
+        'regex_test_step': r'\s*//\s*(S\d+:\s*.+)',
+        'regex_test_ver': r'\s*//\s*(V\d+:\s*.+)',
+        'requirement_group': 1,
+        # blocTest descriptions may be on one of the lines after 'blocTest<Bloc, State>('
+        'requirement_lookahead_triggers': ['blocTest<'],
+        'test_detection_strategy': 'prefix',
+        'test_detection_limit': 8192,
+        'test_import_patterns': [
+            r'^\s*import\s+[\'"]package:test/test\.dart[\'"]',
+            r'^\s*import\s+[\'"]package:flutter_test/flutter_test\.dart[\'"]',
+            r'^\s*import\s+[\'"]package:mockito/mockito\.dart[\'"]',
+            r'^\s*import\s+[\'"]package:bloc_test/bloc_test\.dart[\'"]',
+            r'^\s*test\s*\(',
+            r'^\s*group\s*\(',
+            r'^\s*testWidgets\s*\(',
+            r'^\s*blocTest\s*<'
+        ]
+    }
+}
+
+class LanguageRegistry:
+    """Compiles language specs lazily, once per language, and caches them for the life of the registry"""
+    # keys a user-defined language may leave out
+    SPEC_DEFAULTS = {
+        'regex_test_step': r'\s*//\s*(S\d+:\s*.+)',
+        'regex_test_ver': r'\s*//\s*(V\d+:\s*.+)',
+        'requirement_group': 1,
+        'requirement_lookahead_triggers': [],
+        'test_detection_strategy': 'prefix',
+        'test_detection_limit': 8192,
+    }
+    REQUIRED_KEYS = ['test_file_ext', 'regex_requirement', 'test_import_patterns']
+
+    def __init__(self, user_specs=None):
+        self.specs = {name: dict(spec) for name, spec in LANGUAGE_SPECS.items()}
+        for name, user_spec in (user_specs or {}).items():
+            name = name.lower()
+            if not isinstance(user_spec, dict):
+                raise Exception(f"Language '{name}' in config must be a mapping of language settings")
+            if name in self.specs:
+                self.specs[name].update(user_spec)
+            else:
+                missing = [key for key in self.REQUIRED_KEYS if key not in user_spec]
+                if missing:
+                    raise Exception(f"Language '{name}' in config is missing: {', '.join(missing)}")
+                self.specs[name] = dict(self.SPEC_DEFAULTS, **user_spec)
+        self._compiled = {}
+
+    def get(self, language):
+        """Returns the compiled language config, compiling it on first use"""
+        language = language.lower()
+        lang_config = self._compiled.get(language)
+        if lang_config is None:
+            if language not in self.specs:
+                raise Exception(f"Unsupported language: {language}. Supported languages: {', '.join(self.specs.keys())}")
+            lang_config = self._compiled[language] = self.compile_spec(language, self.specs[language])
+        return lang_config
+
+    @staticmethod
+    def compile_spec(language, spec):
+        def as_list(value):
+            return [value] if isinstance(value, str) else list(value)
+        try:
+            lang_config = dict(spec)
+            lang_config['regex_requirement'] = [re.compile(pattern) for pattern in as_list(spec['regex_requirement'])]
+            lang_config['regex_test_step'] = re.compile(spec['regex_test_step'])
+            lang_config['regex_test_ver'] = re.compile(spec['regex_test_ver'])
+            lang_config['test_import_patterns'] = [re.compile(pattern) for pattern in as_list(spec['test_import_patterns'])]
+            lang_config['requirement_lookahead_triggers'] = as_list(spec['requirement_lookahead_triggers'])
+        except re.error as e:
+            raise Exception(f"Invalid pattern in language '{language}': {e}")
+        return lang_config
+
+
+class RequirementTextNormalizer:
+    """Turns a test name into requirement text: camel case to sentence case, then the conversions, then the cleanups,
+    then an upper case first letter. Conversions and cleanups that cannot match are skipped with a substring test, the
+    cleanup regexes are compiled once, and results are memoized in a bounded LRU cache because the same test names
+    recur across platforms."""
+    def __init__(self, conversions, cleanups, cache_size=8192):
+        # 'A' -> ' a' for the ASCII fast path of the camel case conversion
+        self.camel_case_table = str.maketrans({char: ' ' + char.lower() for char in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'})
+        # consecutive conversions of underscore tokens ('_ q_', ..., '_') are skipped with one test when the text has no '_'
+        self.conversion_groups = []
+        for key, value in conversions:
+            guard = '_' if '_' in key else None
+            if guard and self.conversion_groups and self.conversion_groups[-1][0] == guard:
+                self.conversion_groups[-1][1].append((key, value))
+            else:
+                self.conversion_groups.append((guard, [(key, value)]))
+        self.cleanups = [(re.compile(regex), value, guard) for regex, value, guard in cleanups]
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+        # time spent normalizing texts that were not cached, read by the --profile metrics around the parsing of each file.
+        # Kept per thread, repos are scanned in threads with --repo-jobs
+        self.local = threading.local()
+
+    @property
+    def seconds(self):
+        return getattr(self.local, 'seconds', 0.0)
+
+    def _normalize(self, text):
+        start = time.perf_counter()
+        text = self.convert_camel_case_to_sentence_case(text)
+        text = self.apply_conversions(text)
+        text = self.apply_cleanups(text)
+        self.local.seconds = self.seconds + time.perf_counter() - start
+        return text[:1].upper() + text[1:]
+
+    def convert_camel_case_to_sentence_case(self, camel_case_string):
+        if camel_case_string.isascii():
+            return camel_case_string.translate(self.camel_case_table).strip()
+        return ''.join(' ' + char.lower() if char.isupper() else char for char in camel_case_string).strip()
+
+    def apply_conversions(self, input_string):
+        for guard, group in self.conversion_groups:
+            if guard and guard not in input_string:
+                continue
+            for key, value in group:
+                input_string = input_string.replace(key, value)
+        return input_string
+
+    def apply_cleanups(self, input_string):
+        for regex, value, guard in self.cleanups:
+            if guard is None or guard in input_string:
+                input_string = regex.sub(value, input_string)
+        return input_string
 
 class Requirement:
+    # (regex, replacement, guard): the guard is a substring every match contains, the cleanup is skipped for texts without it (None = always run)
+    CLEANUPS = [  # the order of these items is important. If a previous item's value is a substring of a later item's key, it will be replaced
+        (r'(\w)\s*/\s*(\w)',r'\1 /\2', '/'), # convert "For a POST request to the/organizations" to "For a POST request to the /organizations"
+        (r'(\w)\s*/\s*([\w-]+?)\s*/\s*(\w)',r'\1 /\2/\3', '/'),
+        (r'([A-Za-z])(\d)',r'\1 \2', None),
+        (r'(?<!\d)(\d+), d,(\d+), d,(\d+), d,(\d+) /(\d+)', r'\1.\2.\3.\4/\5', ', d,'),  # converts IP addresses from '192, d, 168, d, 1, d, 1 /24' to 192.168.1.1/24. (?<!\d) only lets a match start at the beginning of a digit run, so long digit runs are not rescanned from every digit
+        (r'([\w]), d,\s*([\w])', r'\1.\2', ', d,'), # converts '192, d, 168' to 192.168
+        (r'(.)" (.+?)"\s*', r'\1 "\2" ', '" '), # converts 'sets this value to" self"' to 'sets this value to "self"'
+        (r' (/[\w\d]+?)-([\w\d]+?) (\w+?) ([/\w]+?) ', r' \1\2\3 ', ' /'), # convert ' /exam- media /all endpoint' to '/exam-media/all endpoint'
+        (r's 3', 's3', 's 3'),  # convert 's 3' to 's3'
+    ]
+
+    CONVERSIONS = [  # the order of these items is important. If a previous item's value is a substring of a later item's key, it will be replaced
+        ('_ q_','"'),
+        ('_ a_','&'),
+        ('_ l_','<'),
+        ('_ g_','>'),
+        ('_ s_','/'),
+        ('_ c_',':'),
+        ('_ p_','|'),
+        ('_ sc_',';'),
+        ('_ eq_','='),
+        ('_ st_','*'),
+        ('_ h_','-'),
+        ('_' ,','),
+        ('p o s t ','POST '),
+        ('g e t ','GET '),
+        ('p u t ','PUT '),
+        ('d e l e t e ','DELETE '),
+        (' aws ',' AWS '),
+        (' vpc ',' VPC '),
+        (' sms',' SMS'),
+        (' cidr ',' CIDR '),
+        (' acl ',' ACL '),
+        (' http ',' HTTP '),
+        (' api ',' API '),
+        (' dns ',' DNS '),
+        (' tls',' TLS'),
+        (' Oauth',' OAuth'),
+        ('s 3 ', 'S3 '),
+        ('ios ', 'iOS ')
+    ]
+
+    # a slotted record: no per-instance __dict__, the test file is a TestFile shared by the requirements of the file and
+    # the steps and verifications are tuples of interned strings (the same step text recurs across many tests), which
+    # keeps runs with 100k+ requirements compact
+    __slots__ = ('req_text', '_req_orig_text', '_test_steps', '_test_verifications', 'test_file', 'test_file_line', 'req_num')
+
     def __init__(self):
         self.req_text = ''
-        self.test_steps = []
-        self.test_verifications = []
-        self.test_file_path = ''
+        self._req_orig_text = ''
+        self._test_steps = ()
+        self._test_verifications = ()
+        self.test_file = TestFile.NONE
         self.test_file_line = 0
-        self.test_filename = ''
+        self.req_num = 0
     
     @property
     def req_orig_text(self):
-        if not hasattr(self, '_req_orig_text'):
-            self._req_orig_text = ''
         return self._req_orig_text
 
     @req_orig_text.setter
     def req_orig_text(self, value):
         self._req_orig_text = value
-        self.req_text = self.convert_camel_case_to_sentence_case(value)
-        self.req_text = self.apply_conversions(self.req_text)
-        self.req_text = self.apply_cleanups(self.req_text)
-        first_char = self.req_text[0]
-        self.req_text = first_char.upper() + self.req_text[1:]
-        self.test_filename = os.path.basename(self.test_file_path)    
+        self.req_text = REQUIREMENT_TEXT_NORMALIZER.normalize(value)
+
+    @property
+    def test_file_path(self):
+        return self.test_file.path
+
+    @test_file_path.setter
+    def test_file_path(self, value):
+        self.test_file = TestFile(value)
+
+    @property
+    def test_filename(self):
+        return self.test_file.filename
+
+    @property
+    def test_steps(self):
+        return self._test_steps
+
+    @test_steps.setter
+    def test_steps(self, value):
+        self._test_steps = tuple(value)
+
+    @property
+    def test_verifications(self):
+        return self._test_verifications
+
+    @test_verifications.setter
+    def test_verifications(self, value):
+        self._test_verifications = tuple(value)
+
+    def add_test_step(self, test_step):
+        self._test_steps += (sys.intern(test_step),)
+
+    def add_test_verification(self, test_verification):
+        self._test_verifications += (sys.intern(test_verification),)
+
+    def __getstate__(self):
+        # pickle stores the TestFile shared by the requirements of a file once (worker results, the parse cache)
+        return (self.req_text, self._req_orig_text, self._test_steps, self._test_verifications, self.test_file, self.test_file_line, self.req_num)
+
+    def __setstate__(self, state):
+        self.req_text, self._req_orig_text, self._test_steps, self._test_verifications, self.test_file, self.test_file_line, self.req_num = state
+        self._test_steps = tuple(map(sys.intern, self._test_steps))
+        self._test_verifications = tuple(map(sys.intern, self._test_verifications))
     
     @property
     def cleanups(self):
-        return [  # the order of these items is important. If a previous item's value is a substring of a later item's key, it will be replaced
-            (r'(\w)\s*/\s*(\w)',r'\1 /\2'), # convert "For a POST request to the/organizations" to "For a POST request to the /organizations"
-            (r'(\w)\s*/\s*([\w-]+?)\s*/\s*(\w)',r'\1 /\2/\3'),
-            (r'([A-Za-z])(\d)',r'\1 \2'),
-            (r'(\d+), d,(\d+), d,(\d+), d,(\d+) /(\d+)', r'\1.\2.\3.\4/\5'),  # converts IP addresses from '192, d, 168, d, 1, d, 1 /24' to 192.168.1.1/24
-            (r'([\w]), d,\s*([\w])', r'\1.\2'), # converts '192, d, 168' to 192.168
-            (r'(.)" (.+?)"\s*', r'\1 "\2" '), # converts 'sets this value to" self"' to 'sets this value to "self"'
-            (r' (/[\w\d]+?)-([\w\d]+?) (\w+?) ([/\w]+?) ', r' \1\2\3 '), # convert ' /exam- media /all endpoint' to '/exam-media/all endpoint'
-            (r's 3', 's3'),  # convert 's 3' to 's3'
-        ]
+        return self.CLEANUPS
 
     @property
     def conversions(self):
-        return [  # the order of these items is important. If a previous item's value is a substring of a later item's key, it will be replaced
-            ('_ q_','"'),
-            ('_ a_','&'),
-            ('_ l_','<'),
-            ('_ g_','>'),
-            ('_ s_','/'),
-            ('_ c_',':'),
-            ('_ p_','|'),
-            ('_ sc_',';'),
-            ('_ eq_','='),
-            ('_ st_','*'),
-            ('_ h_','-'),
-            ('_' ,','),
-            ('p o s t ','POST '),
-            ('g e t ','GET '),
-            ('p u t ','PUT '),
-            ('d e l e t e ','DELETE '),
-            (' aws ',' AWS '),
-            (' vpc ',' VPC '),
-            (' sms',' SMS'),
-            (' cidr ',' CIDR '),
-            (' acl ',' ACL '),
-            (' http ',' HTTP '),
-            (' api ',' API '),
-            (' dns ',' DNS '),
-            (' tls',' TLS'),
-            (' Oauth',' OAuth'),
-            ('s 3 ', 'S3 '),
-            ('ios ', 'iOS ')
-        ]
+        return self.CONVERSIONS
     
     def apply_conversions(self, input_string):
-        for key, value in self.conversions:
-            input_string = input_string.replace(key, value)
-        return input_string
+        return REQUIREMENT_TEXT_NORMALIZER.apply_conversions(input_string)
     
     def apply_cleanups(self, input_string):
-        for regex, value in self.cleanups:
-            res = re.findall(regex, input_string)
-            if len(res) > 0:
-                input_string = re.sub(regex, value, input_string)
-        return input_string
+        return REQUIREMENT_TEXT_NORMALIZER.apply_cleanups(input_string)
 
     # create a function that receives a camel_case string and replaces all capital letters with a space and the same letter lowercased
     def convert_camel_case_to_sentence_case(self, camel_case_string):
-        result = ''
-        for char in camel_case_string:
-            if char.isupper():
-                result += ' ' + char.lower()
-            else:
-                result += char
-        return result.strip()        
+        return REQUIREMENT_TEXT_NORMALIZER.convert_camel_case_to_sentence_case(camel_case_string)
 
     def __repr__(self):
-        return f"Requirement: {self.req_text}\n\tTest steps: {self.test_steps}\n\tTest verifications: {self.test_verifications}"
+        return f"Requirement: {self.req_text}\n\tTest steps: {list(self.test_steps)}\n\tTest verifications: {list(self.test_verifications)}"
+
+REQUIREMENT_TEXT_NORMALIZER = RequirementTextNormalizer(Requirement.CONVERSIONS, Requirement.CLEANUPS)
+
+class TestFile:
+    """The path and file name of a test file, shared by all requirements parsed from it and freed with them"""
+    __slots__ = ('path', 'filename')
+
+    def __init__(self, path):
+        self.path = path
+        self.filename = os.path.basename(path)
+
+    def __getstate__(self):
+        return self.path
+
+    def __setstate__(self, path):
+        self.path = path
+        self.filename = os.path.basename(path)
+
+TestFile.NONE = TestFile('')
 
 class Section:
+    __slots__ = ('name', 'filenames', 'requirements', 'path_key')
+
     def __init__(self):
         self.name = ''
         self.filenames = []
         self.requirements = []
         self.path_key = ''
 
+class SectionIndex:
+    """Classifies test files into the sections of a repo.
+
+    Sections are tried in config order and the first one whose path_key (if any) occurs in the file path and whose
+    filenames contain the file name wins. A file matching no section falls back to the last 'Miscellaneous'
+    section whose path_key matches. Only the sections listing a file name are looked at, and every file is
+    classified once.
+    """
+    def __init__(self, sections):
+        self.sections_by_filename = {}
+        self.misc_sections = []
+        self.section_by_path = {}
+        for section in sections:
+            for filename in section.filenames or []:
+                candidates = self.sections_by_filename.setdefault(filename, [])
+                if not candidates or candidates[-1] is not section:
+                    candidates.append(section)
+            if section.name == 'Miscellaneous':
+                self.misc_sections.append(section)
+
+    def classify(self, file_path, filename):
+        if file_path in self.section_by_path:
+            return self.section_by_path[file_path]
+        section = self.match(file_path, self.sections_by_filename.get(filename, ()))
+        if section is None:
+            section = self.match(file_path, reversed(self.misc_sections))
+        self.section_by_path[file_path] = section
+        return section
+
+    def match(self, file_path, sections):
+        for section in sections:
+            if section.path_key == '' or section.path_key in file_path:
+                return section
+        return None
+
+class SectionList(list):
+    """The sections of a repo in config order, indexed for classification on first use"""
+    def __init__(self, sections=()):
+        super().__init__(sections)
+        self._classifier = None
+
+    @property
+    def classifier(self):
+        if self._classifier is None:
+            self._classifier = SectionIndex(self)
+        return self._classifier
+
 class TestGroup:
+    __slots__ = ('file_path', 'filename', 'requirements')
+
     def __init__(self):
         self.file_path = ''
         self.filename = ''
         self.requirements = []
 
+class DirectoryListingCache:
+    """Directory listings shared by the walks of all repos in a run, so repos with the same or nested roots read each directory once"""
+    def __init__(self):
+        self.listings = {}
+
+    def list_dir(self, dir_path):
+        key = os.path.abspath(dir_path)
+        listing = self.listings.get(key)
+        if listing is None:
+            # concurrent walks may both read a directory the first time, the listings are the same either way
+            listing = self.listings[key] = self.read_dir(dir_path)
+        return listing
+
+    @staticmethod
+    def read_dir(dir_path):
+        """Returns (name, is_dir, is_symlink) for each entry of dir_path, nothing if it cannot be read"""
+        listing = []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    listing.append((entry.name, is_dir, is_dir and entry.is_symlink()))
+        except OSError:
+            pass
+        return listing
+
+class FileDiscovery:
+    """Lists the candidate files of a repo: the files with the test file extension that are not excluded.
+
+    Include and exclude entries are glob patterns. A pattern without a '/' matches a file or directory name
+    anywhere in the repo (e.g. 'Pods'), a pattern with a '/' matches the path relative to the repo root
+    (e.g. 'ios/Generated/*'). Excluded directories are never entered.
+    """
+    DEFAULT_EXCLUDE = ['.git', 'node_modules', '__pycache__', '.venv', 'venv', 'build', 'dist', 'target']
+
+    def __init__(self, test_file_ext, include=None, exclude=None, workers=1, listing_cache=None):
+        self.test_file_ext = test_file_ext
+        self.listing_cache = listing_cache
+        self.include = self.compile_patterns(include or [])
+        self.exclude = self.compile_patterns(self.DEFAULT_EXCLUDE + (exclude or []))
+        self.has_include = bool(include)
+        self.workers = workers
+
+    @staticmethod
+    def compile_patterns(patterns):
+        """Compiles glob patterns into a (name regex, relative path regex) pair, None when there are no patterns of that kind"""
+        name_patterns = [fnmatch.translate(pattern) for pattern in patterns if '/' not in pattern]
+        path_patterns = [fnmatch.translate(pattern.strip('/')) for pattern in patterns if '/' in pattern]
+        return (
+            re.compile('|'.join(name_patterns)) if name_patterns else None,
+            re.compile('|'.join(path_patterns)) if path_patterns else None,
+        )
+
+    @staticmethod
+    def matches(patterns, name, rel_path):
+        name_re, path_re = patterns
+        return bool((name_re and name_re.match(name)) or (path_re and path_re.match(rel_path)))
+
+    def is_excluded_dir(self, name, rel_path):
+        # the trailing '/' lets 'a/*' style patterns prune the directory 'a' itself
+        return self.matches(self.exclude, name, rel_path) or self.matches(self.exclude, name, rel_path + '/')
+
+    def is_candidate(self, name, rel_path):
+        if not name.endswith(self.test_file_ext) or self.matches(self.exclude, name, rel_path):
+            return False
+        return not self.has_include or self.matches(self.include, name, rel_path)
+
+    def walk(self, repo_path):
+        """Walks repo_path with os.scandir in the same order as os.walk, fanning the top-level subtrees out over a thread pool when workers > 1"""
+        files, sub_dirs = self._scan_dir(repo_path, '')
+        if self.workers > 1 and len(sub_dirs) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for sub_files in executor.map(self._walk_tree, sub_dirs):
+                    files += sub_files
+        else:
+            for sub_dir in sub_dirs:
+                files += self._walk_tree(sub_dir)
+        return files
+
+    def _walk_tree(self, dir_info):
+        files = []
+        stack = [dir_info]
+        while stack:
+            dir_files, sub_dirs = self._scan_dir(*stack.pop())
+            files += dir_files
+            # depth first, the first sub directory on top of the stack
+            stack += reversed(sub_dirs)
+        return files
+
+    def _scan_dir(self, dir_path, dir_rel_path):
+        files = []
+        sub_dirs = []
+        if self.listing_cache is not None:
+            listing = self.listing_cache.list_dir(dir_path)
+        else:
+            listing = DirectoryListingCache.read_dir(dir_path)
+        for name, is_dir, is_symlink in listing:
+            rel_path = f"{dir_rel_path}/{name}" if dir_rel_path else name
+            if is_dir:
+                # like os.walk, symlinked directories are not followed
+                if not is_symlink and not self.is_excluded_dir(name, rel_path):
+                    sub_dirs.append((os.path.join(dir_path, name), rel_path))
+            elif self.is_candidate(name, rel_path):
+                files.append(os.path.join(dir_path, name))
+        return files, sub_dirs
+
+    def list_git_index(self, repo_path):
+        """Lists the candidate files tracked in the git index of repo_path, so untracked and ignored files are never walked.
+        Returns None if repo_path is not inside a git work tree."""
+        try:
+            result = subprocess.run(['git', '-C', repo_path, 'ls-files', '-z', '--cached'], capture_output=True, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return self.filter_rel_paths(repo_path, result.stdout.decode('utf-8', errors='surrogateescape').split('\0'))
+
+    def list_git_tree(self, git_tree):
+        """Lists the candidate files in the commit of a GitTree"""
+        return self.filter_rel_paths(git_tree.repo_path, git_tree.list_files())
+
+    def filter_rel_paths(self, repo_path, rel_paths):
+        """Returns the paths of the candidates among the '/' separated paths relative to repo_path, in the given order"""
+        files = []
+        excluded_dirs = set()
+        for rel_path in rel_paths:
+            if not rel_path:
+                continue
+            parts = rel_path.split('/')
+            if not self.is_candidate(parts[-1], rel_path):
+                continue
+            # a file is skipped if any of its parent directories is excluded, the same as when walking
+            excluded = False
+            for i in range(1, len(parts)):
+                dir_rel_path = '/'.join(parts[:i])
+                if dir_rel_path in excluded_dirs or self.is_excluded_dir(parts[i - 1], dir_rel_path):
+                    excluded_dirs.add(dir_rel_path)
+                    excluded = True
+                    break
+            if not excluded:
+                files.append(os.path.join(repo_path, *parts))
+        return files
+
+class GitTree:
+    """The files of a commit (git_ref) of the git repository containing repo_path, read from its object store without a checkout.
+
+    list_files() lists the regular files below repo_path with git ls-tree and remembers their blob ids, read() returns
+    the content of a blob through one long-lived git cat-file --batch process. Close it (or use it as a context manager)
+    to stop that process.
+    """
+    def __init__(self, repo_path, ref):
+        self.repo_path = repo_path
+        self.ref = ref
+        try:
+            result = subprocess.run(['git', '-C', repo_path, 'rev-parse', '--verify', '--quiet', f'{ref}^{{commit}}'], capture_output=True, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            raise Exception(f"git_ref '{ref}' is not a commit in the git repository of '{repo_path}'")
+        self.commit = result.stdout.decode('ascii').strip()
+        # candidate file path (repo_path joined with the path in the commit) -> blob id
+        self.blob_ids = {}
+        self.process = None
+        self.lock = threading.Lock()
+
+    def list_files(self):
+        """Returns the '/' separated paths, relative to repo_path, of the regular files of the commit below repo_path"""
+        # without --full-tree, ls-tree lists the tree of the current directory (repo_path) with paths relative to it
+        result = subprocess.run(['git', '-C', self.repo_path, 'ls-tree', '-r', '-z', self.commit], capture_output=True, check=True)
+        rel_paths = []
+        for line in result.stdout.decode('utf-8', errors='surrogateescape').split('\0'):
+            if not line:
+                continue
+            info, rel_path = line.split('\t', 1)
+            mode, object_type, blob_id = info.split()
+            # submodules and symlinks have no test file content
+            if object_type != 'blob' or mode == '120000':
+                continue
+            self.blob_ids[os.path.join(self.repo_path, *rel_path.split('/'))] = blob_id
+            rel_paths.append(rel_path)
+        return rel_paths
+
+    def read(self, blob_id):
+        """Returns the content of the blob blob_id"""
+        with self.lock:
+            if self.process is None:
+                self.process = subprocess.Popen(['git', '-C', self.repo_path, 'cat-file', '--batch'], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            self.process.stdin.write(blob_id.encode('ascii') + b'\n')
+            self.process.stdin.flush()
+            header = self.process.stdout.readline().split()
+            if len(header) != 3:
+                raise Exception(f"git object {blob_id} could not be read from the git repository of '{self.repo_path}'")
+            data = self.process.stdout.read(int(header[2]))
+            # every object is followed by a newline
+            self.process.stdout.read(1)
+        return data
+
+    def close(self):
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.wait()
+            self.process.stdout.close()
+            self.process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class RequirementScanner:
+    """Matches the requirements, test steps and test verifications of a whole file with one combined regex.
+
+    The language patterns are line patterns: every alternative is anchored at the start of a line and its \\s, \\W,
+    \\D and negated classes do not match a newline, so only an explicit \\n (e.g. Java's
+    '@Test\\s*\\n\\s*public void') lets a pattern span lines. At the same line the first matching alternative wins, in the order requirements,
+    lookahead requirements, test steps, test verifications.
+    """
+    def __init__(self, req_patterns, test_step_pattern, test_verification_pattern, requirement_group=1, lookahead_triggers=()):
+        alternatives = [f'(?P<req{i}>{self.to_line_pattern(pattern)})' for i, pattern in enumerate(req_patterns)]
+        for i, trigger in enumerate(lookahead_triggers):
+            # A requirement whose description is on one of the next 3 lines, e.g. "blocTest<Bloc, State>(\n  'description',"
+            alternatives.append(
+                f'(?P<look{i}>[^\\n]*{re.escape(trigger)}[^\\n]*)'
+                f'(?:(?=(?:\\n[^\\n]*){{0,2}}?\\n[^\\S\\n]*[\'"](?P<desc{i}>.+?)[\'"],?[^\\S\\n]*$))?'
+            )
+        alternatives.append(f'(?P<step>{self.to_line_pattern(test_step_pattern)})')
+        alternatives.append(f'(?P<ver>{self.to_line_pattern(test_verification_pattern)})')
+        self.regex = re.compile('^(?:' + '|'.join(alternatives) + ')', re.MULTILINE)
+        # maps the name of the outermost matched group to the kind of match and the group holding its text
+        self.groups = {'step': ('step', self.regex.groupindex['step'] + 1), 'ver': ('ver', self.regex.groupindex['ver'] + 1)}
+        for i in range(len(req_patterns)):
+            self.groups[f'req{i}'] = ('req', self.regex.groupindex[f'req{i}'] + requirement_group)
+        for i in range(len(lookahead_triggers)):
+            self.groups[f'look{i}'] = ('look', None)
+            self.groups[f'desc{i}'] = ('req', self.regex.groupindex[f'desc{i}'])
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get(cls, req_patterns, test_step_pattern, test_verification_pattern, requirement_group=1, lookahead_triggers=()):
+        """Returns the (cached) scanner for the given patterns"""
+        return cls(req_patterns, test_step_pattern, test_verification_pattern, requirement_group, lookahead_triggers)
+
+    @staticmethod
+    def to_line_pattern(pattern):
+        """Rewrites a pattern so that it matches within a line only: \\s, \\W, \\D and negated classes like [^)] would
+        otherwise match the newline too. \\W or \\D in a non-negated class can't be restricted and are rejected."""
+        result = []
+        in_class = negated = False
+        i = 0
+        while i < len(pattern):
+            if pattern[i] == '\\' and i + 1 < len(pattern):
+                escape = pattern[i:i + 2]
+                if escape == r'\s':
+                    escape = r' \t\r\f\v' if in_class else r'[^\S\n]'
+                elif escape in (r'\W', r'\D'):
+                    if in_class and not negated:
+                        raise Exception(f"Pattern '{pattern}' can match a newline with {escape} in a character class, use a negated class instead")
+                    if not in_class:
+                        escape = f'[^{escape.swapcase()}\\n]'
+                result.append(escape)
+                i += 2
+                continue
+            if pattern[i] == '[' and not in_class:
+                in_class = True
+                negated = pattern.startswith('^', i + 1)
+                start = i + 2 if negated else i + 1
+                # a ] right after [ or [^ is part of the class
+                if pattern.startswith(']', start):
+                    start += 1
+                result.append(pattern[i:start])
+                i = start
+                continue
+            if pattern[i] == ']' and in_class:
+                if negated:
+                    result.append(r'\n')
+                in_class = False
+            result.append(pattern[i])
+            i += 1
+        return ''.join(result)
+
+class TestFileDetector:
+    """Detects test files by running all testing framework import patterns of a language, joined into one bytes
+    regex, once over the start of the file. The start is either the first `limit` bytes ('prefix' strategy) or the
+    first `limit` lines ('lines' strategy)."""
+    STRATEGIES = ['prefix', 'lines']
+
+    def __init__(self, test_import_patterns, strategy='prefix', limit=8192):
+        if strategy not in self.STRATEGIES:
+            raise Exception(f"Unsupported test detection strategy: {strategy}. Supported strategies: {', '.join(self.STRATEGIES)}")
+        self.strategy = strategy
+        self.limit = limit
+        # the number of bytes to read before the file can be classified (-1 = the whole file)
+        self.read_size = limit if strategy == 'prefix' else -1
+        pattern = '|'.join(f'(?:{RequirementScanner.to_line_pattern(p)})' for p in test_import_patterns)
+        self.regex = re.compile(pattern.encode('utf-8'), re.MULTILINE)
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get(cls, test_import_patterns, strategy='prefix', limit=8192):
+        """Returns the (cached) detector for the given patterns"""
+        return cls(test_import_patterns, strategy, limit)
+
+    def is_test_file(self, data):
+        if self.strategy == 'lines':
+            end = -1
+            for _ in range(self.limit):
+                end = data.find(b'\n', end + 1)
+                if end < 0:
+                    break
+            if end >= 0:
+                data = data[:end]
+        else:
+            data = data[:self.limit]
+        return self.regex.search(data) is not None
+
+class ParseCache:
+    """On-disk cache of the scan result (test file detection and parsed requirements) of each candidate file of a repo.
+
+    Entries are keyed by file path and validated by size, mtime and content hash, or for files read from git (git_ref)
+    by their blob id. The entries hold the normalized requirement texts, so the whole cache is discarded when the
+    language config, the normalization rules (Requirement.CONVERSIONS / CLEANUPS), the source of the detection,
+    parsing and normalization code (parser_digest) or the cache format change.
+    """
+    VERSION = 7
+
+    def __init__(self, cache_dir, repo_name, lang_config):
+        self.cache_file_path = os.path.join(cache_dir, f"{repo_name}.pickle")
+        self.lang_hash = self.get_lang_config_hash(lang_config)
+        self.entries = {}
+        self.hits = 0
+        try:
+            with open(self.cache_file_path, 'rb') as file:
+                data = pickle.load(file)
+            if data.get('version') == self.VERSION and data.get('lang_hash') == self.lang_hash:
+                self.entries = data['entries']
+        except (OSError, EOFError, pickle.PickleError, AttributeError, KeyError, TypeError):
+            # A missing or unreadable cache just means every file gets scanned again
+            self.entries = {}
+
+    @staticmethod
+    def get_lang_config_hash(lang_config):
+        parts = [lang_config['test_file_ext'], str(lang_config['requirement_group'])]
+        parts += [pattern.pattern for pattern in lang_config['regex_requirement']]
+        parts += [lang_config['regex_test_step'].pattern, lang_config['regex_test_ver'].pattern]
+        parts += [pattern.pattern for pattern in lang_config['test_import_patterns']]
+        parts += lang_config['requirement_lookahead_triggers']
+        parts += [lang_config['test_detection_strategy'], str(lang_config['test_detection_limit'])]
+        parts += [repr(Requirement.CONVERSIONS), repr(Requirement.CLEANUPS), ParseCache.parser_digest()]
+        return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def parser_digest():
+        """The sha1 of the source of the code the cached entries come from, so changing it needs no VERSION bump"""
+        sources = [Requirement, RequirementTextNormalizer, RequirementScanner, TestFileDetector, CreateFDADocumentation.scan_file,
+                   CreateFDADocumentation.scan_blob, CreateFDADocumentation.parse_entry, CreateFDADocumentation.parse_text_for_requirements]
+        return hashlib.sha1(''.join(map(inspect.getsource, sources)).encode('utf-8')).hexdigest()
+
+    def get(self, file_path):
+        """Returns the cached entry for file_path, or None if its size or mtime changed since it was cached"""
+        entry = self.entries.get(file_path)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (entry['size'], entry['mtime']):
+            return None
+        self.hits += 1
+        return entry
+
+    def get_blob(self, file_path, blob_id):
+        """Returns the cached entry for file_path if it was scanned from the git blob blob_id, None otherwise"""
+        entry = self.entries.get(file_path)
+        if entry is None or entry['hash'] != blob_id:
+            return None
+        self.hits += 1
+        return entry
+
+    def get_hash(self, file_path):
+        entry = self.entries.get(file_path)
+        return entry['hash'] if entry else None
+
+    def put(self, file_path, entry):
+        self.entries[file_path] = entry
+
+    def save(self, candidate_files):
+        """Evicts the entries of files that no longer exist and writes the cache"""
+        candidate_files = set(candidate_files)
+        self.entries = {path: entry for path, entry in self.entries.items() if path in candidate_files}
+        os.makedirs(os.path.dirname(self.cache_file_path), exist_ok=True)
+        tmp_path = self.cache_file_path + '.tmp'
+        with open(tmp_path, 'wb') as file:
+            pickle.dump({'version': self.VERSION, 'lang_hash': self.lang_hash, 'entries': self.entries}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_file_path)
+
+class ShardFile:
+    """The parse result of one shard of a repo: every node of a sharded run parses the candidate files whose relative
+    path hashes to its shard and writes them to <repo_name>.<i>-of-<N>.jsonl, merge() combines the shards of a repo.
+
+    The first line is a header, every other line holds one test file with its index in the candidate file list and its
+    requirements as [line, text, steps, verifications]. The header carries a fingerprint of the candidate file list,
+    so shards are only merged if all nodes listed the same files in the same order, which makes the merged order
+    (and the DO/VER numbering) the same as that of a single node run.
+    """
+    VERSION = 1
+
+    @staticmethod
+    def shard_of(rel_path, shard_count):
+        return int(hashlib.sha1(rel_path.encode('utf-8', errors='surrogateescape')).hexdigest()[:8], 16) % shard_count
+
+    @staticmethod
+    def fingerprint(rel_paths):
+        return hashlib.sha1('\0'.join(rel_paths).encode('utf-8', errors='surrogateescape')).hexdigest()
+
+    @staticmethod
+    def get_path(shard_dir, repo_name, shard_index, shard_count):
+        return os.path.join(shard_dir, f"{repo_name}.{shard_index}-of-{shard_count}.jsonl")
+
+    @classmethod
+    def write(cls, shard_dir, repo_name, shard_index, shard_count, candidate_rel_paths, test_files, requirements, indexes):
+        """Writes the test files (given by their index in the candidate file list) and their requirements of one shard"""
+        requirements_by_file = {}
+        for req in requirements:
+            requirements_by_file.setdefault(req.test_file_path, []).append(
+                [req.test_file_line, req.req_orig_text, list(req.test_steps), list(req.test_verifications)])
+        os.makedirs(shard_dir, exist_ok=True)
+        shard_path = cls.get_path(shard_dir, repo_name, shard_index, shard_count)
+        tmp_path = shard_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            header = {'version': cls.VERSION, 'repo': repo_name, 'shard': shard_index, 'shards': shard_count,
+                      'candidates': len(candidate_rel_paths), 'fingerprint': cls.fingerprint(candidate_rel_paths)}
+            file.write(json.dumps(header) + '\n')
+            for file_path in test_files:
+                record = {'index': indexes[file_path], 'path': file_path, 'requirements': requirements_by_file.get(file_path, [])}
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, shard_path)
+        return shard_path
+
+    @staticmethod
+    def find(shard_dir, repo_name):
+        """Returns {shard count: {shard index: path}} of the shard files of repo_name in shard_dir. The names are
+        matched exactly, so the shards of a repo named e.g. '<repo_name>.v2' are not included"""
+        name_re = re.compile(re.escape(repo_name) + r'\.(\d+)-of-(\d+)\.jsonl')
+        shards = {}
+        try:
+            file_names = os.listdir(shard_dir)
+        except OSError:
+            return shards
+        for file_name in file_names:
+            match = name_re.fullmatch(file_name)
+            if match:
+                shards.setdefault(int(match.group(2)), {})[int(match.group(1))] = os.path.join(shard_dir, file_name)
+        return shards
+
+    @classmethod
+    def remove_other_counts(cls, shard_dir, repo_name, shard_count):
+        """Removes the shards of repo_name left by an earlier run with a different shard count"""
+        for count, paths in cls.find(shard_dir, repo_name).items():
+            if count != shard_count:
+                for shard_path in paths.values():
+                    os.remove(shard_path)
+
+    @classmethod
+    def merge(cls, shard_dir, repo_name):
+        """Reads all shards of a repo and returns (test_files, requirements) in candidate file order. If shards with
+        more than one shard count are found, the newest complete set is merged"""
+        shards = cls.find(shard_dir, repo_name)
+        if not shards:
+            raise Exception(f"No shard files for '{repo_name}' found in {shard_dir}")
+        complete = [paths for count, paths in shards.items() if sorted(paths) == list(range(count))]
+        if not complete:
+            found = sorted((index, count) for count, paths in shards.items() for index in paths)
+            raise Exception(f"Incomplete shards for '{repo_name}' in {shard_dir}: found {found}, no shard count has all of its shards")
+        paths = max(complete, key=lambda paths: max(os.path.getmtime(shard_path) for shard_path in paths.values()))
+        headers = []
+        records = []
+        for shard_path in paths.values():
+            with open(shard_path, 'r', encoding='utf-8') as file:
+                header = json.loads(file.readline())
+                if header.get('version') != cls.VERSION or header.get('repo') != repo_name:
+                    raise Exception(f"{shard_path} is not a shard of '{repo_name}' written by this version")
+                headers.append(header)
+                records.extend(json.loads(line) for line in file if line.strip())
+        shard_count = headers[0]['shards']
+        if sorted(header['shard'] for header in headers) != list(range(shard_count)) or any(header['shards'] != shard_count for header in headers):
+            raise Exception(f"Incomplete shards for '{repo_name}' in {shard_dir}: found {sorted((header['shard'], header['shards']) for header in headers)}, expected 0 to {shard_count - 1} of {shard_count}")
+        if len({(header['candidates'], header['fingerprint']) for header in headers}) != 1:
+            raise Exception(f"The shards of '{repo_name}' were made from different file lists, rerun all shards on the same tree")
+        records.sort(key=lambda record: record['index'])
+        test_files = []
+        requirements = []
+        for record in records:
+            test_files.append(record['path'])
+            test_file = TestFile(record['path'])
+            for line, text, steps, verifications in record['requirements']:
+                req = Requirement()
+                req.test_file = test_file
+                req.test_file_line = line
+                req.req_orig_text = text
+                req.test_steps = steps
+                req.test_verifications = verifications
+                requirements.append(req)
+        return test_files, requirements
+
+class CheckReport:
+    """Findings of a --check run, or of the post-processing of a documentation run, written as one JSON document.
+
+    A finding is a dict with repo, code, file, line and message. The codes are missing_verifications (the requirement
+    would be left out of the documents), orphan_step / orphan_verification (found before any requirement of the file),
+    duplicate_step_number / duplicate_verification_number (also V1 and V01, which number the same step),
+    unsorted_verifications (V tags not in ascending order, which the documents silently sort) and
+    duplicate_requirement (a test whose requirement text normalizes to the same text as an earlier test in another
+    file of the repo; tests of one file sharing a text, e.g. table-driven variants, are not reported).
+    """
+    def __init__(self):
+        self.findings = []
+        self.repos = []
+
+    def add(self, repo_name, code, file_path, line, message):
+        self.findings.append({'repo': repo_name, 'code': code, 'file': file_path, 'line': line, 'message': message})
+
+    def check_orphan(self, repo_name, file_path, line, kind, text):
+        self.add(repo_name, f'orphan_{kind}', file_path, line, f"Test {kind} found without a requirement: '{text}'")
+
+    def to_dict(self):
+        counts = {}
+        for finding in self.findings:
+            counts[finding['code']] = counts.get(finding['code'], 0) + 1
+        return {'findings': self.findings, 'counts': counts, 'repos': self.repos}
+
+    def write(self, stream):
+        json.dump(self.to_dict(), stream, indent=2)
+        stream.write('\n')
+
+class RequirementPostProcessor:
+    """Filters, sorts and validates the classified requirements of one repo, the problems go to a CheckReport.
+
+    Every section but Ignore is processed in one pass: requirements without verifications are left out, the S/V tags
+    are parsed once into integer numbers, and the verifications are sorted by them only if they are out of order.
+    Numbers used twice in a test and requirement texts seen before in the repo are found with sets and a dict, so the
+    whole stage is linear in the number of requirements.
+    """
+    TAG_NUMBER = re.compile(r'[A-Za-z]+(\d+)')
+
+    def __init__(self, repo_name, report=None):
+        self.repo_name = repo_name
+        self.report = report if report is not None else CheckReport()
+        # normalized requirement text -> the first requirement with it
+        self.requirement_texts = {}
+
+    @classmethod
+    def tag_numbers(cls, texts):
+        """Returns the S/V number of every text, the numbers used more than once and whether they are in ascending order.
+        A text without a numbered tag gets the number of the text before it (0 for the first), so sorting keeps it there."""
+        numbers, seen, duplicates, ascending = [], set(), set(), True
+        number = 0
+        for text in texts:
+            match = cls.TAG_NUMBER.match(text)
+            if match:
+                value = int(match.group(1))
+                if value < number:
+                    ascending = False
+                if value in seen:
+                    duplicates.add(value)
+                seen.add(value)
+                number = value
+            numbers.append(number)
+        return numbers, sorted(duplicates), ascending
+
+    @staticmethod
+    def sort_by_numbers(texts, numbers):
+        # a stable sort, texts with the same number keep their order
+        return [text for _, text in sorted(zip(numbers, texts), key=lambda pair: pair[0])]
+
+    @classmethod
+    def sort_verifications(cls, req):
+        """Sorts the verifications of req by their V numbers, without validating them"""
+        numbers, _, ascending = cls.tag_numbers(req.test_verifications)
+        if not ascending:
+            req.test_verifications = cls.sort_by_numbers(req.test_verifications, numbers)
+
+    def process(self, sections):
+        """Processes the sections in place, returns the report"""
+        for section in sections:
+            if section.name == 'Ignore':
+                continue
+            kept = []
+            for req in section.requirements:
+                if self.process_requirement(req):
+                    kept.append(req)
+            section.requirements = kept
+        return self.report
+
+    def process_requirement(self, req):
+        """Validates req and sorts its verifications, returns False if it is left out of the documents"""
+        file_path, line = req.test_file_path, req.test_file_line
+        step_numbers, step_duplicates, _ = self.tag_numbers(req.test_steps)
+        self.check_duplicates(req, 'step', step_duplicates)
+        if len(req.test_verifications) == 0:
+            self.report.add(self.repo_name, 'missing_verifications', file_path, line, f"No verifications for '{req.req_orig_text}'")
+            return False
+        numbers, duplicates, ascending = self.tag_numbers(req.test_verifications)
+        self.check_duplicates(req, 'verification', duplicates)
+        if not ascending:
+            self.report.add(self.repo_name, 'unsorted_verifications', file_path, line,
+                            f"Verifications of '{req.req_orig_text}' are not in ascending order: {', '.join(text.split(':')[0] for text in req.test_verifications)}")
+            req.test_verifications = self.sort_by_numbers(req.test_verifications, numbers)
+        first = self.requirement_texts.setdefault(req.req_text, req)
+        if first.test_file_path != file_path:
+            self.report.add(self.repo_name, 'duplicate_requirement', file_path, line,
+                            f"'{req.req_orig_text}' has the same requirement text as {os.path.basename(first.test_file_path)}:{first.test_file_line}")
+        return True
+
+    def check_duplicates(self, req, kind, duplicates):
+        if duplicates:
+            self.report.add(self.repo_name, f'duplicate_{kind}_number', req.test_file_path, req.test_file_line,
+                            f"{kind.capitalize()} number{'s' if len(duplicates) > 1 else ''} {', '.join(map(str, duplicates))} used more than once in '{req.req_orig_text}'")
+
+class VerificationTableWriter:
+    """Fills the verification table of a section with one row per requirement.
+
+    The rows are built directly as XML elements in one batch: the rows that do not exist in the table yet are cloned
+    from a prototype of the row python-docx's add_row() creates, then every cell is written at the element level. This
+    avoids the proxy lists (table.rows, row.cells) that python-docx rebuilds on every access, and produces the same XML
+    as filling the table through the proxies.
+    """
+    def __init__(self, document, tag, test_step_num_style, tag_style, debug_print=False):
+        from docx.enum.style import WD_STYLE_TYPE
+        self.tag = tag
+        self.test_step_num_style_id = document.part.get_style_id(test_step_num_style, WD_STYLE_TYPE.PARAGRAPH)
+        self.tag_style_id = document.part.get_style_id(tag_style, WD_STYLE_TYPE.CHARACTER)
+        self.debug_print = debug_print
+
+    def new_row_prototype(self, tbl):
+        from docx.oxml import OxmlElement
+        tr = OxmlElement('w:tr')
+        for gridCol in tbl.tblGrid.gridCol_lst:
+            tc = tr.add_tc()
+            if gridCol.w is not None:
+                tc.width = gridCol.w
+        return tr
+
+    def fill(self, table, requirements, ver_step_num):
+        """Writes requirements into the rows after the header row, returns the next verification step number"""
+        from docx.table import _Row
+        from docx.text.font import Font
+        tbl = table._tbl
+        # the existing rows after the header are used first, like rows[i + 1] after add_row() would
+        existing_rows = tbl.tr_lst[1:]
+        row_cells = [[cell._tc for cell in _Row(tr, table).cells] for tr in existing_rows[:len(requirements)]]
+        new_row_count = len(requirements) - 1
+        if new_row_count > 0:
+            prototype = self.new_row_prototype(tbl)
+            new_rows = [deepcopy(prototype) for _ in range(new_row_count)]
+            row_cells.extend(tr.tc_lst for tr in new_rows[:len(requirements) - len(row_cells)])
+            tbl.extend(new_rows)
+        for req, cells in zip(requirements, row_cells):
+            self.set_text(cells[0], f"{ver_step_num}.").style = self.test_step_num_style_id
+            ver_step_num += 1
+            self.set_text(cells[1], '\n'.join(req.test_steps))
+            self.set_text(cells[2], '\n'.join(req.test_verifications))
+            r = cells[2].add_p().add_r()
+            r.text = f"[{self.tag}:DO:{req.req_num}]"
+            r.style = self.tag_style_id
+            Font(r).bold = True
+            if self.debug_print:
+                cells[2].add_p().add_r().text = f"({os.path.basename(req.test_file_path)}:{req.test_file_line})"
+        return ver_step_num
+
+    def set_text(self, tc, text):
+        """Replaces the content of a cell with a single paragraph holding text, like _Cell.text, returns the paragraph"""
+        tc.clear_content()
+        p = tc.add_p()
+        p.add_r().text = text
+        return p
+
+class DocxStreamWriter:
+    """Writes a document to a .docx file while it is being built, so only one section is held in memory.
+
+    Every flush() serializes the body content built so far into word/document.xml and removes it from the document.
+    The body's final sectPr stays in place until close(), which also writes the other parts of the template package.
+    The body is serialized under a copy of the document root, so the bytes equal those of document.save().
+    """
+    MARKER = 'fda-stream'
+
+    @staticmethod
+    def is_supported():
+        """True if the installed python-docx has the private PackageWriter helpers close() relies on (1.x)"""
+        from docx.opc.pkgwriter import PackageWriter
+        return all(hasattr(PackageWriter, name) for name in ('_write_content_types_stream', '_write_pkg_rels'))
+
+    def __init__(self, document, filename):
+        from lxml import etree
+        from docx.opc.oxml import serialize_part_xml
+        self.document = document
+        self.body = document.element.body
+        # a copy of the document root (all namespace declarations and the elements before the body) with an empty body
+        self.skeleton = etree.Element(document.element.tag, attrib=dict(document.element.attrib), nsmap=document.element.nsmap)
+        for element in document.element:
+            if element is self.body:
+                break
+            self.skeleton.append(deepcopy(element))
+        self.skeleton_body = etree.SubElement(self.skeleton, self.body.tag, attrib=dict(self.body.attrib))
+        self.marker = etree.Comment(self.MARKER)
+        self.skeleton_body.append(self.marker)
+        self.head, self.tail = serialize_part_xml(self.skeleton).split(etree.tostring(self.marker))
+        self.package = document.part.package
+        self.filename = filename
+        # written next to the output and moved over it by close(), so an interrupted render never replaces a good document
+        self.tmp_path = filename + '.tmp'
+        self.closed = False
+        self.zipf = zipfile.ZipFile(self.tmp_path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.stream = self.zipf.open(document.part.partname.membername, 'w')
+        self.stream.write(self.head)
+
+    def flush(self, keep_sect_pr=True):
+        from lxml import etree
+        from docx.opc.oxml import serialize_part_xml
+        elements = list(self.body)
+        if keep_sect_pr and elements and elements[-1].tag.endswith('}sectPr'):
+            elements.pop()
+        if not elements:
+            return
+        for element in elements:
+            self.marker.addprevious(element)
+        data = serialize_part_xml(self.skeleton)
+        self.stream.write(data[len(self.head):len(data) - len(self.tail) - len(etree.tostring(self.marker))])
+        for element in elements:
+            self.skeleton_body.remove(element)
+
+    def close(self):
+        from docx.opc.pkgwriter import PackageWriter
+        self.flush(keep_sect_pr=False)
+        self.stream.write(self.tail)
+        self.stream.close()
+        parts = list(self.package.parts)
+        for part in parts:
+            part.before_marshal()
+        # PackageWriter's private helpers with this object as the physical writer (only write() is called on it),
+        # checked by is_supported() before streaming is used
+        PackageWriter._write_content_types_stream(self, parts)
+        PackageWriter._write_pkg_rels(self, self.package.rels)
+        for part in parts:
+            if part is not self.document.part:
+                self.write(part.partname, part.blob)
+            if len(part.rels):
+                self.write(part.partname.rels_uri, part.rels.xml)
+        self.zipf.close()
+        os.replace(self.tmp_path, self.filename)
+        self.closed = True
+
+    def abort(self):
+        """Closes and removes the partly written file, if close() did not complete"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.zipf.close()
+        except Exception:
+            # the stream of document.xml may still be open, which a failed render does not need to finish
+            pass
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def write(self, pack_uri, blob):
+        self.zipf.writestr(pack_uri.membername, blob)
+
+class TemplateCache:
+    """Parsed .docx templates by path, re-read when their mtime or size changes, handed out as deep copies"""
+    def __init__(self):
+        self.templates = {}
+
+    def get(self, docx_path, prepare=None):
+        """Returns a copy of the template at docx_path, prepare(document) is applied once when the template is parsed"""
+        stat = os.stat(docx_path)
+        key = (os.path.abspath(docx_path), prepare.__name__ if prepare else None)
+        entry = self.templates.get(key)
+        if entry is None or entry[0] != (stat.st_mtime_ns, stat.st_size):
+            from docx import Document
+            document = Document(docx_path)
+            if prepare:
+                prepare(document)
+            entry = self.templates[key] = ((stat.st_mtime_ns, stat.st_size), document)
+        return deepcopy(entry[1])
+
+# each process (including render pool workers) keeps its own parsed templates
+TEMPLATE_CACHE = TemplateCache()
+
+class OutputManifest:
+    """The .fda_manifest.json of an Outputs/ directory: for every document in it, the digest of the inputs it was
+    rendered from and the sha1 of the file that was written. A document whose inputs have the same digest, and whose
+    file was not changed since, does not need to be rendered again.
+    """
+    VERSION = 1
+    FILENAME = '.fda_manifest.json'
+
+    def __init__(self, outputs_dir):
+        self.path = os.path.join(outputs_dir, self.FILENAME)
+        self.lock = threading.Lock()
+        self.outputs = {}
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+            if data.get('version') == self.VERSION:
+                self.outputs = data['outputs']
+        except (OSError, ValueError, KeyError, AttributeError):
+            # a missing or unreadable manifest just means every document is rendered
+            self.outputs = {}
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def generator_digest():
+        """The sha1 of this script, so a new version of it renders every document again"""
+        with open(os.path.abspath(__file__), 'rb') as file:
+            return hashlib.sha1(file.read()).hexdigest()
+
+    @staticmethod
+    def file_digest(file_path):
+        with open(file_path, 'rb') as file:
+            return hashlib.sha1(file.read()).hexdigest()
+
+    def is_current(self, output_path, digest):
+        """True if output_path was rendered from inputs with this digest and has not been changed since"""
+        entry = self.outputs.get(os.path.basename(output_path))
+        if entry is None or entry['digest'] != digest:
+            return False
+        try:
+            return self.file_digest(output_path) == entry['sha1']
+        except OSError:
+            return False
+
+    def record(self, output_path, digest):
+        """Stores the digest of the inputs output_path was just rendered from and writes the manifest"""
+        sha1 = self.file_digest(output_path)
+        with self.lock:
+            self.outputs[os.path.basename(output_path)] = {'digest': digest, 'sha1': sha1}
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump({'version': self.VERSION, 'outputs': self.outputs}, file, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+class DocxBackend:
+    """Output backend creating the SRS and the verification protocol .docx documents from the repo's templates"""
+    NAME = 'docx'
+
+    def __init__(self, template_req_doc_path, template_ver_doc_path, output_req_doc_path, output_ver_doc_path):
+        self.template_req_doc_path = template_req_doc_path
+        self.template_ver_doc_path = template_ver_doc_path
+        self.output_req_doc_path = output_req_doc_path
+        self.output_ver_doc_path = output_ver_doc_path
+
+    def write(self, fda, sections, tag):
+        """Renders both documents (in the render pool with jobs > 1), returns their futures"""
+        return [
+            fda.render(fda.create_requirements_document, sections, tag, self.template_req_doc_path, self.output_req_doc_path),
+            fda.render(fda.create_verification_document, sections, tag, self.template_ver_doc_path, self.output_ver_doc_path),
+        ]
+
+class TraceabilityBackend(abc.ABC):
+    """Base of the output backends writing the DO/VER mapping of a repo to one text file, without python-docx.
+
+    Every requirement becomes one row with the numbers the documents give it: the DO number of the requirement, the VER
+    number of its section and its step number in the verification protocol. The file is written section by section and
+    replaced atomically once complete.
+    """
+    NAME = None
+    EXTENSION = None
+    FIELDS = ['section', 'ver', 'step', 'do', 'requirement', 'test_steps', 'test_verifications', 'file', 'line']
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+
+    def iter_sections(self, sections, tag):
+        """Yields (section name, rows) for every section in the verification protocol, numbered like it"""
+        ver_num = 1
+        ver_step_num = 1
+        for section in sections:
+            if section.name == 'Ignore' or len(section.requirements) == 0:
+                continue
+            rows = []
+            for req in section.requirements:
+                rows.append({
+                    'section': section.name,
+                    'ver': f"{tag}:VER:{ver_num}",
+                    'step': ver_step_num,
+                    'do': f"{tag}:DO:{req.req_num}",
+                    'requirement': req.req_text,
+                    'test_steps': list(req.test_steps),
+                    'test_verifications': list(req.test_verifications),
+                    'file': req.test_file_path,
+                    'line': req.test_file_line,
+                })
+                ver_step_num += 1
+            ver_num += 1
+            yield section.name, rows
+
+    def write(self, fda, sections, tag):
+        with fda.phase('traceability_render'):
+            os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+            tmp_path = self.output_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as file:
+                self.begin(file, tag)
+                for section_name, rows in self.iter_sections(sections, tag):
+                    self.write_section(file, section_name, rows)
+                    file.flush()
+                self.end(file)
+            os.replace(tmp_path, self.output_path)
+        print(f"Saved {self.NAME} traceability matrix: {self.output_path}")
+        return []
+
+    def begin(self, file, tag):
+        pass
+
+    @abc.abstractmethod
+    def write_section(self, file, section_name, rows):
+        """Writes the rows of one section"""
+
+    def end(self, file):
+        pass
+
+class JsonLinesBackend(TraceabilityBackend):
+    """One JSON object per requirement"""
+    NAME = 'jsonl'
+    EXTENSION = '.jsonl'
+
+    def write_section(self, file, section_name, rows):
+        for row in rows:
+            file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+class CsvBackend(TraceabilityBackend):
+    """One CSV row per requirement after a header row, steps and verifications are one line each within their cell"""
+    NAME = 'csv'
+    EXTENSION = '.csv'
+
+    def begin(self, file, tag):
+        self.writer = csv.writer(file)
+        self.writer.writerow(self.FIELDS)
+
+    def write_section(self, file, section_name, rows):
+        for row in rows:
+            self.writer.writerow(['\n'.join(row[field]) if isinstance(row[field], list) else row[field] for field in self.FIELDS])
+
+class HtmlBackend(TraceabilityBackend):
+    """A static HTML page with one traceability table, a header row per section"""
+    NAME = 'html'
+    EXTENSION = '.html'
+    STYLE = ('body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;width:100%}'
+             'th,td{border:1px solid #ccc;padding:4px 8px;text-align:left;vertical-align:top}'
+             'th{background:#eee}tr.section td{background:#f6f6f6;font-weight:bold}.tag{color:#c00;font-weight:bold;white-space:nowrap}'
+             'ul{margin:0;padding-left:1.2em}.file{color:#666;font-size:smaller}')
+
+    def begin(self, file, tag):
+        file.write(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(tag)} traceability matrix</title>'
+                   f'<style>{self.STYLE}</style></head><body>\n<h1>{html.escape(tag)} traceability matrix</h1>\n<table>\n'
+                   '<tr><th>DO</th><th>Requirement</th><th>Step</th><th>Test steps</th><th>Verifications</th><th>Test</th></tr>\n')
+
+    def write_section(self, file, section_name, rows):
+        file.write(f'<tr class="section"><td class="tag">{html.escape(rows[0]["ver"])}</td><td colspan="5">{html.escape(section_name)}</td></tr>\n')
+        for row in rows:
+            steps = ''.join(f'<li>{html.escape(step)}</li>' for step in row['test_steps'])
+            verifications = ''.join(f'<li>{html.escape(verification)}</li>' for verification in row['test_verifications'])
+            file.write(f'<tr id="{html.escape(row["do"])}"><td class="tag">{html.escape(row["do"])}</td><td>{html.escape(row["requirement"])}</td>'
+                       f'<td>{row["step"]}.</td><td><ul>{steps}</ul></td><td><ul>{verifications}</ul></td>'
+                       f'<td class="file">{html.escape(os.path.basename(row["file"]))}:{row["line"]}</td></tr>\n')
+
+    def end(self, file):
+        file.write('</table>\n</body></html>\n')
+
+# output backends selectable per repo with 'outputs' in config.yaml
+OUTPUT_BACKENDS = {backend.NAME: backend for backend in [DocxBackend, JsonLinesBackend, CsvBackend, HtmlBackend]}
+
+class Metrics:
+    """Instrumentation of a run: wall time per phase, per file scan times, counters and peak RSS.
+
+    Phases measured around a block of work are wall times. detection, parsing and normalization are the sums of the
+    per file times, which run in the worker processes when jobs > 1. With profile_dir, every phase run in the main
+    process is also profiled with cProfile and the profile of the slowest phase is written to profile_dir.
+    """
+    PHASES = ['config', 'discovery', 'scan', 'detection', 'parsing', 'normalization', 'classification', 'postprocess', 'srs_render', 'verification_render', 'traceability_render', 'save']
+    SUMMED_PHASES = ['detection', 'parsing', 'normalization']
+    SLOWEST_FILES = 10
+
+    def __init__(self, profile_dir=None):
+        self.phases = {}
+        self.counters = {}
+        self.files = []
+        self.repos = []
+        self.profile_dir = profile_dir
+        self.profiles = {}
+        self.active_profile = None
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # pool workers get a copy to measure into, without the lock and the profiles of this process
+        state = self.__dict__.copy()
+        state.update(lock=None, profiles={}, active_profile=None, profile_dir=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        profile = self.start_profile(name) if self.profile_dir else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+            if profile:
+                profile.disable()
+                self.active_profile = None
+
+    def start_profile(self, name):
+        # one profile runs at a time, so phases of other threads or nested phases are not profiled
+        with self.lock:
+            if self.active_profile is not None:
+                return None
+            self.active_profile = self.profiles.setdefault(name, cProfile.Profile())
+        self.active_profile.enable()
+        return self.active_profile
+
+    def add_phase(self, name, seconds, count=1):
+        with self.lock:
+            phase = self.phases.setdefault(name, [0.0, 0])
+            phase[0] += seconds
+            phase[1] += count
+
+    def merge_phases(self, phases):
+        for name, (seconds, count) in phases.items():
+            self.add_phase(name, seconds, count)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_file(self, file_path, timing):
+        self.add_phase('detection', timing['detect'])
+        if timing['is_test_file']:
+            self.add_phase('parsing', timing['parse'] - timing['normalize'])
+            self.add_phase('normalization', timing['normalize'])
+        self.count('lines', timing['lines'])
+        self.count('bytes_read', timing['bytes'])
+        with self.lock:
+            self.files.append(dict(timing, path=file_path))
+
+    @staticmethod
+    def peak_rss_mb():
+        """Peak resident set size of this process and of its largest finished child process (a worker or a git command), in MB"""
+        try:
+            import resource
+        except ImportError:
+            return None
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        unit = 1 if sys.platform == 'darwin' else 1024
+        return {
+            'main': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 1e6,
+            'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 1e6,
+        }
+
+    def slowest_phase(self):
+        profiled = [name for name in self.profiles if name in self.phases]
+        return max(profiled, key=lambda name: self.phases[name][0]) if profiled else None
+
+    def dump_profile(self):
+        """Writes the cProfile stats of the slowest profiled phase to profile_dir and returns the path"""
+        name = self.slowest_phase()
+        if not self.profile_dir or name is None:
+            return None
+        os.makedirs(self.profile_dir, exist_ok=True)
+        profile_path = os.path.join(self.profile_dir, f"{name}.prof")
+        self.profiles[name].dump_stats(profile_path)
+        return profile_path
+
+    def to_dict(self):
+        names = [name for name in self.PHASES if name in self.phases] + sorted(name for name in self.phases if name not in self.PHASES)
+        return {
+            'phases': {name: {'seconds': self.phases[name][0], 'count': self.phases[name][1], 'summed': name in self.SUMMED_PHASES} for name in names},
+            'counters': dict(self.counters),
+            'peak_rss_mb': self.peak_rss_mb(),
+            'repos': self.repos,
+            'files': sorted(self.files, key=lambda file: file['path']),
+        }
+
+    def write_json(self, json_path):
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def print_summary(self):
+        metrics = self.to_dict()
+        print("Metrics:")
+        print(f"  {'phase':<20} {'seconds':>9} {'count':>7}")
+        for name, phase in metrics['phases'].items():
+            note = '  (sum over files)' if phase['summed'] else ''
+            print(f"  {name:<20} {phase['seconds']:>9.3f} {phase['count']:>7}{note}")
+        print("  " + ', '.join(f"{name.replace('_', ' ')}: {value}" for name, value in sorted(metrics['counters'].items())))
+        slowest_files = sorted(self.files, key=lambda file: file['seconds'], reverse=True)[:self.SLOWEST_FILES]
+        if slowest_files:
+            print("  slowest files:")
+            for file in slowest_files:
+                print(f"    {file['seconds']:>8.4f}s {file['lines']:>7} lines  {file['path']}")
+        peak_rss = metrics['peak_rss_mb']
+        if peak_rss:
+            print(f"  peak RSS: {peak_rss['main']:.0f} MB (main process), {peak_rss['children']:.0f} MB (largest child process, workers and git)")
+
 class CreateFDADocumentation:
-    def __init__(self, debug_print=False, config_file_path='config.yaml'):
+    def __init__(self, debug_print=False, config_file_path='config.yaml', jobs=1, use_cache=True, stream_output=False, repo_jobs=1,
+                 shard=None, merge_shards=False, shard_dir=None, metrics=None, force=False, quiet=False):
         self.debug_print = debug_print
+        # None when used as a library (iter_requirements) without a config file, only the built-in languages are known then
         self.config_file_path = config_file_path
+        config_dir = os.path.dirname(os.path.abspath(config_file_path)) if config_file_path else os.getcwd()
+        # parsed requirements are cached per test file in .fda_cache/ next to the config file
+        self.use_cache = use_cache
+        self.cache_dir = os.path.join(config_dir, '.fda_cache')
+        # number of worker processes used to parse test files (0 = one per CPU)
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        # write the documents section by section instead of building them in memory first
+        self.stream_output = stream_output
+        if stream_output and not DocxStreamWriter.is_supported():
+            print("Warning: the installed python-docx does not support --stream, the documents are built in memory and saved instead")
+            self.stream_output = False
+        # number of repos processed at the same time by create_all_documentation()
+        self.repo_jobs = max(1, repo_jobs)
+        # sharded runs: with shard=(i, N) only shard i of N of every repo is parsed and written to shard_dir,
+        # with merge_shards the shards in shard_dir are merged and rendered instead of parsing the repos
+        self.shard = shard
+        self.merge_shards = merge_shards
+        self.shard_dir = shard_dir or os.path.join(config_dir, '.fda_shards')
+        # a Metrics object to instrument the run with (--profile / --metrics-json), None to not measure anything
+        self.metrics = metrics
+        # pools the documents are rendered and the files of all repos are scanned in when jobs > 1, and the directory
+        # listings shared by the repos of a run
+        self.render_pool = None
+        self.scan_pool = None
+        self.listing_cache = None
+        # parse caches kept in memory between the regenerations of --watch, by cache name (None = read from disk every run)
+        self.parse_caches = None
+        # render documents even if the output manifest shows they are up to date
+        self.force = force
+        # the output manifests by Outputs/ directory, and the outputs the last create_all_documentation() did not render again
+        self.manifests = {}
+        self.manifests_lock = threading.Lock()
+        self.skipped_outputs = []
+        # no warnings and errors are printed while scanning (iter_requirements)
+        self.quiet = quiet
         pass
+
+    def __getstate__(self):
+        # this object is pickled into pool workers, which neither need nor can receive the render pool and the listings
+        state = self.__dict__.copy()
+        state['render_pool'] = None
+        state['scan_pool'] = None
+        state['listing_cache'] = None
+        state['parse_caches'] = None
+        state['manifests'] = {}
+        state['manifests_lock'] = None
+        # workers measure into their own Metrics, what they measured is sent back with their results
+        state['metrics'] = Metrics() if self.metrics is not None else None
+        return state
+
+    def phase(self, name):
+        """Context manager timing a phase of the run when metrics are enabled"""
+        return self.metrics.phase(name) if self.metrics is not None else contextlib.nullcontext()
     
     #using yaml config file for better readability and structure
     @property
@@ -131,261 +1690,260 @@ class CreateFDADocumentation:
                 print(f"Error: {self.config_file_path} file not found")
                 raise Exception(f'{self.config_file_path} file not found. Please create it and put in the same directory as this script.')
             try:
-                with open(self.config_file_path, 'r') as file:
+                with self.phase('config'), open(self.config_file_path, 'r') as file:
                     self._config = yaml.safe_load(file)
             except Exception as e:
                 raise Exception(f"Error: {self.config_file_path} file could not be parsed. {e}")
         return self._config
 
-    def get_test_files_for_language(self, repo_path, language):
-        """Recursively searches repo_path for test files by detecting testing framework imports"""
-        lang_config = self.get_language_config(language)
-        test_file_ext = lang_config['test_file_ext']
-        test_import_patterns = lang_config['test_import_patterns']
-        
-        found_test_files = []
-        
-        # Walk through all directories in the repo
-        for root, dirs, files in os.walk(repo_path):
-            # Skip common non-source directories
-            dirs[:] = [d for d in dirs if d not in ['.git', 'node_modules', '__pycache__', '.venv', 'venv', 'build', 'dist', 'target']]
-            
-            for file_name in files:
-                # Check if file has the correct extension
-                if not file_name.endswith(test_file_ext):
-                    continue
-                
-                file_path = os.path.join(root, file_name)
-                
-                # Check if file contains testing framework imports
-                if self._is_test_file(file_path, test_import_patterns):
-                    found_test_files.append(file_path)
-        
-        return found_test_files
-    
-    def _is_test_file(self, file_path, test_import_patterns):
-        """Check if a file contains any of the testing framework import patterns"""
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                # Read only the first 50 lines to check for imports (performance optimization)
-                lines_to_check = 50
-                for i, line in enumerate(file):
-                    if i >= lines_to_check:
-                        break
-                    
-                    # Check each test import pattern
-                    for pattern in test_import_patterns:
-                        if pattern.search(line):
-                            return True
-            return False
-        except (IOError, UnicodeDecodeError):
-            # If we can't read the file, assume it's not a test file
-            return False
+    def get_candidate_files_for_language(self, repo_path, language, include=None, exclude=None, use_git_index=False, git_tree=None):
+        """Recursively searches repo_path for files with the language's test file extension, or lists them from the git index
+        or from the commit of a GitTree"""
+        discovery = FileDiscovery(self.get_language_config(language)['test_file_ext'], include, exclude, self.jobs, self.listing_cache)
+        with self.phase('discovery'):
+            if git_tree:
+                return discovery.list_git_tree(git_tree)
+            if use_git_index:
+                candidate_files = discovery.list_git_index(repo_path)
+                if candidate_files is not None:
+                    return candidate_files
+                if not self.quiet:
+                    print(f"  Warning: '{repo_path}' is not a git work tree, searching the file system instead")
+            return discovery.walk(repo_path)
+
+    def get_test_file_detector(self, lang_config):
+        return TestFileDetector.get(
+            tuple(pattern.pattern for pattern in lang_config['test_import_patterns']),
+            lang_config['test_detection_strategy'],
+            lang_config['test_detection_limit']
+        )
     
-    def parse_file_for_requirements(self, file_path, req_regexes, test_step_re, test_verification_re, requirement_group=1):
+    def parse_text_for_requirements(self, file_path, text, req_regexes, test_step_re, test_verification_re, requirement_group=1, lookahead_triggers=(), orphans=None):
+        scanner = RequirementScanner.get(
+            tuple(req_re.pattern for req_re in req_regexes),
+            test_step_re.pattern,
+            test_verification_re.pattern,
+            requirement_group,
+            tuple(lookahead_triggers)
+        )
         requirements = []
-        with open(file_path, 'r') as file:
-            lines = file.readlines()
-            curr_req = None
-            for i, line in enumerate(lines):
-                # Check all requirement regex patterns
-                req_match = None
-                for req_re in req_regexes:
-                    req_match = req_re.match(line)
-                    if req_match:
-                        break
-                
-                if req_match:
-                    if curr_req:
-                        requirements.append(curr_req)
-                    curr_req = Requirement()
-                    curr_req.test_file_path = file_path
-                    curr_req.test_file_line = i + 1
-                    curr_req.req_orig_text = req_match.group(requirement_group)
-                    continue
-                
-                # Special handling for blocTest pattern where description might be on next line
-                if 'blocTest<' in line and not req_match:
-                    # Look for description in next few lines
-                    for j in range(1, 4):  # Check next 3 lines
-                        if i + j < len(lines):
-                            next_line = lines[i + j]
-                            desc_match = re.match(r'^\s*[\'"](.+?)[\'"],?\s*$', next_line)
-                            if desc_match:
-                                if curr_req:
-                                    requirements.append(curr_req)
-                                curr_req = Requirement()
-                                curr_req.test_file_path = file_path
-                                curr_req.test_file_line = i + 1
-                                curr_req.req_orig_text = desc_match.group(1)
-                                break
-                    continue
-                
-                ts_match = test_step_re.match(line)
-                if ts_match:
-                    if not curr_req:
-                        print(f"  Error: Test step found without a requirement {os.path.basename(file_path)}: {i} - '{line}'")
-                    else:
-                        curr_req.test_steps.append(ts_match.group(1))
-                    continue
-                tv_match = test_verification_re.match(line)
-                if tv_match:
-                    if not curr_req:
-                        print(f"  Error: Test verification found without a requirement {os.path.basename(file_path)}: {i} - '{line}'")
-                    else:
-                        curr_req.test_verifications.append(tv_match.group(1))
-                    continue
+        test_file = TestFile(file_path)
+        curr_req = None
+        line_num = 1
+        line_start = 0
+        for match in scanner.regex.finditer(text):
+            # Matches come in file order, so only the newlines since the previous match need to be counted
+            line_num += text.count('\n', line_start, match.start())
+            line_start = match.start()
+            kind, text_group = scanner.groups[match.lastgroup]
+            if kind == 'req':
+                if curr_req:
+                    requirements.append(curr_req)
+                curr_req = Requirement()
+                curr_req.test_file = test_file
+                curr_req.test_file_line = line_num
+                curr_req.req_orig_text = match.group(text_group)
+            elif kind == 'look':
+                # A lookahead trigger without a description on the next lines
+                continue
+            elif not curr_req:
+                line_end = text.find('\n', line_start)
+                line = text[line_start:line_end + 1] if line_end >= 0 else text[line_start:]
+                if orphans is not None:
+                    orphans.append((line_num, 'step' if kind == 'step' else 'verification', line.strip()))
+            elif kind == 'step':
+                curr_req.add_test_step(match.group(text_group))
+            else:
+                curr_req.add_test_verification(match.group(text_group))
         if curr_req:
             requirements.append(curr_req)
         return requirements
+
+    def scan_file(self, file_path, lang_config, cached_hash=None):
+        """Opens file_path once, and both detects whether it is a test file and parses its requirements.
+
+        Returns the cache entry for the file, or None if it could not be read. If the content hash equals
+        cached_hash the file is not parsed again and the entry's requirements are None.
+        """
+        detector = self.get_test_file_detector(lang_config)
+        start = time.perf_counter()
+        try:
+            with open(file_path, 'rb') as file:
+                stat = os.fstat(file.fileno())
+                # Most candidate files are not test files, so only read the rest of the file once the start matched
+                data = file.read(detector.read_size)
+                is_test_file = detector.is_test_file(data)
+                detected = time.perf_counter()
+                if is_test_file:
+                    data += file.read()
+        except OSError:
+            return None
+        # The hash of a file that is not a test file only covers its start, which is all its classification depends on
+        entry = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'hash': hashlib.sha1(data).hexdigest(),
+            'is_test_file': False,
+            'requirements': [],
+            # (line, 'step' or 'verification', line text) of the steps and verifications found before any requirement
+            'orphans': [],
+        }
+        if entry['hash'] == cached_hash:
+            entry['requirements'] = None
+            return entry
+        return self.parse_entry(entry, file_path, data, is_test_file, lang_config, start, detected)
+
+    def scan_blob(self, file_path, data, blob_id, lang_config):
+        """Same as scan_file for the content of a git blob that was read into memory, the entry's hash is the blob id"""
+        detector = self.get_test_file_detector(lang_config)
+        start = time.perf_counter()
+        is_test_file = detector.is_test_file(data)
+        detected = time.perf_counter()
+        entry = {
+            'size': len(data),
+            'mtime': None,
+            'hash': blob_id,
+            'is_test_file': False,
+            'requirements': [],
+            'orphans': [],
+        }
+        return self.parse_entry(entry, file_path, data, is_test_file, lang_config, start, detected)
+
+    def parse_entry(self, entry, file_path, data, is_test_file, lang_config, start, detected):
+        """Parses the requirements of a test file into its cache entry, and adds the timing when metrics are enabled"""
+        normalize_seconds = REQUIREMENT_TEXT_NORMALIZER.seconds
+        lines = 0
+        if is_test_file:
+            # Same newline translation as reading the file in text mode
+            text = data.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+            entry['is_test_file'] = True
+            entry['requirements'] = self.parse_text_for_requirements(
+                file_path,
+                text,
+                lang_config['regex_requirement'], 
+                lang_config['regex_test_step'], 
+                lang_config['regex_test_ver'], 
+                lang_config['requirement_group'],
+                lang_config['requirement_lookahead_triggers'],
+                entry['orphans']
+            )
+            lines = text.count('\n') + 1
+        if self.metrics is not None:
+            # taken out again by scan_test_files(), it is not cached
+            end = time.perf_counter()
+            entry['timing'] = {
+                'seconds': end - start,
+                'detect': detected - start,
+                'parse': end - detected,
+                'normalize': REQUIREMENT_TEXT_NORMALIZER.seconds - normalize_seconds,
+                'lines': lines,
+                'bytes': len(data),
+                'is_test_file': is_test_file,
+            }
+        return entry
+
+    def _map_files(self, function, file_paths, *args):
+        """Calls function(file_path, *args) for every file, in a process pool when jobs > 1, and yields the results in file_paths order"""
+        if self.jobs <= 1 or len(file_paths) < 2:
+            yield from map(function, file_paths, *args)
+            return
+        # executor.map yields results in submission order, so the merged results (and therefore the DO/VER numbering)
+        # are identical to the serial path. Files are handed out in chunks to keep the pickling overhead low.
+        chunksize = max(1, len(file_paths) // (self.jobs * 4))
+        if self.scan_pool is not None:
+            yield from self.scan_pool.map(function, file_paths, *args, chunksize=chunksize)
+            return
+        with self.create_pool() as executor:
+            yield from executor.map(function, file_paths, *args, chunksize=chunksize)
+
+    def create_pool(self, **kwargs):
+        """Returns a process pool of jobs workers. With --repo-jobs the pools are used from several threads, and a
+        process forked while another thread holds a lock (e.g. the one of stdout) can deadlock, so the workers are then
+        started from a fork server"""
+        mp_context = None
+        if self.repo_jobs > 1 and 'forkserver' in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context('forkserver')
+        return ProcessPoolExecutor(max_workers=self.jobs, mp_context=mp_context, **kwargs)
+
+    def scan_test_files(self, candidate_files, lang_config, cache=None, orphans=None, git_tree=None):
+        """Scans all candidate files, reading each one once, and returns the test files and their requirements in candidate_files order.
+        If orphans is a list, (file_path, line, kind, line text) of every step and verification without a requirement is added to it.
+        With a GitTree the files are read from its commit instead of the file system."""
+        with self.phase('scan'):
+            test_files, requirements = self._scan_test_files(candidate_files, lang_config, cache, orphans, git_tree)
+        if self.metrics is not None:
+            self.metrics.count('candidate_files', len(candidate_files))
+            self.metrics.count('test_files', len(test_files))
+            self.metrics.count('requirements', len(requirements))
+        return test_files, requirements
+
+    def print_orphans(self, orphans):
+        """Prints the (file_path, line, kind, line text) found by scan_test_files"""
+        for file_path, line, kind, text in orphans:
+            print(f"  Error: Test {kind} found without a requirement {os.path.basename(file_path)}: {line - 1} - '{text}'")
+
+    def scan_files(self, file_paths, lang_config, cached_hashes=None, git_tree=None):
+        """Yields the scan entry of every file (see scan_file) in file_paths order, the files are read from the
+        commit of git_tree if given"""
+        if git_tree:
+            # the blobs are read here, through the one cat-file process, and scanned from memory
+            blob_ids = [git_tree.blob_ids[file_path] for file_path in file_paths]
+            return self._map_files(self.scan_blob, file_paths, map(git_tree.read, blob_ids), blob_ids, repeat(lang_config))
+        return self._map_files(self.scan_file, file_paths, repeat(lang_config), cached_hashes or repeat(None))
+
+    def _scan_test_files(self, candidate_files, lang_config, cache, orphans=None, git_tree=None):
+        entries = {}
+        if cache is not None:
+            # Only files that changed since the last run need to be scanned
+            for file_path in candidate_files:
+                entry = cache.get_blob(file_path, git_tree.blob_ids[file_path]) if git_tree else cache.get(file_path)
+                if entry is not None:
+                    entries[file_path] = entry
+        files_to_scan = [file_path for file_path in candidate_files if file_path not in entries]
+        cached_hashes = [cache.get_hash(file_path) for file_path in files_to_scan] if cache is not None and not git_tree else None
+        results = self.scan_files(files_to_scan, lang_config, cached_hashes, git_tree)
+        for file_path, entry in zip(files_to_scan, results):
+            print(f"Processing file: {os.path.basename(file_path)}", end='\r')
+            if entry is None:
+                continue
+            timing = entry.pop('timing', None)
+            if timing is not None:
+                self.metrics.record_file(file_path, timing)
+            if entry['requirements'] is None:
+                # Touched but unchanged (e.g. by a checkout), keep the cached result with the new size and mtime. The size
+                # can differ too: the hash of a file that is not a test file only covers its start
+                cached_entry = cache.entries[file_path]
+                cached_entry['size'] = entry['size']
+                cached_entry['mtime'] = entry['mtime']
+                entry = cached_entry
+                cache.hits += 1
+            entries[file_path] = entry
+            if cache is not None:
+                cache.put(file_path, entry)
+        if cache is not None:
+            cache.save(candidate_files)
+            print(f"  Parse cache: {cache.hits} of {len(candidate_files)} files unchanged")
+        test_files = [file_path for file_path in candidate_files if file_path in entries and entries[file_path]['is_test_file']]
+        requirements = []
+        for test_file in test_files:
+            requirements += entries[test_file]['requirements']
+            if orphans is not None:
+                orphans.extend((test_file, *orphan) for orphan in entries[test_file]['orphans'])
+        return test_files, requirements
     
+    @property
+    def language_registry(self):
+        if not hasattr(self, '_language_registry'):
+            # user-defined languages are read from the config file when there is one
+            user_specs = None
+            if self.config_file_path and os.path.exists(self.config_file_path):
+                user_specs = (self.config or {}).get('languages')
+            self._language_registry = LanguageRegistry(user_specs)
+        return self._language_registry
+
     def get_language_config(self, language):
         """Returns language-specific configuration for parsing test files"""
-        language_configs = {
-            'golang': {
-                'test_file_ext': '.go',
-                'regex_requirement': [
-                    re.compile(r'^func\s+Test_*(.+)\(t\s+\*testing.T\)'),
-                ],
-                'regex_test_step': re.compile(r'\s+//\s*(S\d+:\s*.+)'),
-                'regex_test_ver': re.compile(r'\s+//\s*(V\d+:\s*.+)'),
-                'requirement_group': 1,
-                'test_import_patterns': [
-                    re.compile(r'^\s*import\s+"testing"'),
-                    re.compile(r'^\s*import\s+\(\s*.*"testing".*\)'),
-                    re.compile(r'^\s*"testing"')
-                ]
-            },
-            'swift': {
-                'test_file_ext': '.swift',
-                'regex_requirement': [
-                    re.compile(r'\s+func\s+test_*(.+)\(\).+\{'),
-                ],
-                'regex_test_step': re.compile(r'\s+//\s*(S\d+:\s*.+)'),
-                'regex_test_ver': re.compile(r'\s+//\s*(V\d+:\s*.+)'),
-                'requirement_group': 1,
-                'test_import_patterns': [
-                    re.compile(r'^\s*import\s+XCTest'),
-                    re.compile(r'^\s*@testable\s+import'),
-                    re.compile(r'class\s+\w+.*:\s*XCTestCase')
-                ]
-            },
-            'python': {
-                'test_file_ext': '.py',
-                'regex_requirement': [
-                    re.compile(r'^\s*def\s+test_*(.+)\('),
-                    re.compile(r'^\s*def\s+test(.+)\(')
-                ],
-                'regex_test_step': re.compile(r'\s*#\s*(S\d+:\s*.+)'),
-                'regex_test_ver': re.compile(r'\s*#\s*(V\d+:\s*.+)'),
-                'requirement_group': 1,
-                'test_import_patterns': [
-                    re.compile(r'^\s*import\s+unittest'),
-                    re.compile(r'^\s*from\s+unittest'),
-                    re.compile(r'^\s*import\s+pytest'),
-                    re.compile(r'^\s*from\s+pytest'),
-                    re.compile(r'class\s+\w+.*\(.*unittest\.TestCase.*\)')
-                ]
-            },
-            'javascript': {
-                'test_file_ext': '.js',
-                'regex_requirement': [
-                    re.compile(r'^\s*(it|test)\(\s*[\'"](.+?)[\'"]'),
-                    re.compile(r'^\s*(it|test)\s*\(\s*[\'"](.+?)[\'"]')
-                ],
-                'regex_test_step': re.compile(r'\s*//\s*(S\d+:\s*.+)'),
-                'regex_test_ver': re.compile(r'\s*//\s*(V\d+:\s*.+)'),
-                'requirement_group': 2,
-                'test_import_patterns': [
-                    re.compile(r'^\s*(import|require).*[\'"]jest[\'"]'),
-                    re.compile(r'^\s*(import|require).*[\'"]mocha[\'"]'),
-                    re.compile(r'^\s*(import|require).*[\'"]chai[\'"]'),
-                    re.compile(r'^\s*describe\s*\('),
-                    re.compile(r'^\s*(it|test)\s*\(')
-                ]
-            },
-            'typescript': {
-                'test_file_ext': '.ts',
-                'regex_requirement': [
-                    re.compile(r'^\s*(it|test)\(\s*[\'"](.+?)[\'"]'),
-                    re.compile(r'^\s*(it|test)\s*\(\s*[\'"](.+?)[\'"]')
-                ],
-                'regex_test_step': re.compile(r'\s*//\s*(S\d+:\s*.+)'),
-                'regex_test_ver': re.compile(r'\s*//\s*(V\d+:\s*.+)'),
-                'requirement_group': 2,
-                'test_import_patterns': [
-                    re.compile(r'^\s*import.*[\'"]jest[\'"]'),
-                    re.compile(r'^\s*import.*[\'"]mocha[\'"]'),
-                    re.compile(r'^\s*import.*[\'"]chai[\'"]'),
-                    re.compile(r'^\s*describe\s*\('),
-                    re.compile(r'^\s*(it|test)\s*\(')
-                ]
-            },
-            'java': {
-                'test_file_ext': '.java',
-                'regex_requirement': [
-                    re.compile(r'^\s*@DisplayName\(\s*[\'"](.+?)[\'"]\s*\)\s*'),
-                    re.compile(r'^\s*@Test\s*\n\s*public\s+void\s+(.+?)\('),
-                    re.compile(r'^\s*void\s+test_*(.+?)\(')
-                ],
-                'regex_test_step': re.compile(r'\s*//\s*(S\d+:\s*.+)'),
-                'regex_test_ver': re.compile(r'\s*//\s*(V\d+:\s*.+)'),
-                'requirement_group': 1,
-                'test_import_patterns': [
-                    re.compile(r'^\s*import\s+org\.junit'),
-                    re.compile(r'^\s*import\s+org\.testng'),
-                    re.compile(r'^\s*@Test'),
-                    re.compile(r'^\s*@BeforeEach'),
-                    re.compile(r'^\s*@AfterEach')
-                ]
-            },
-            'csharp': {
-                'test_file_ext': '.cs',
-                'regex_requirement': [
-                    re.compile(r'^\s*\[Test\]\s*\n\s*public\s+void\s+Test(.+?)\('),
-                    re.compile(r'^\s*\[Test\]\s*public\s+void\s+Test(.+?)\('),
-                    re.compile(r'^\s*\[TestMethod\]\s*\n\s*public\s+void\s+(.+?)\('),
-                    re.compile(r'^\s*\[Fact\]\s*\n\s*public\s+void\s+(.+?)\(')
-                ],
-                'regex_test_step': re.compile(r'\s*//\s*(S\d+:\s*.+)'),
-                'regex_test_ver': re.compile(r'\s*//\s*(V\d+:\s*.+)'),
-                'requirement_group': 1,
-                'test_import_patterns': [
-                    re.compile(r'^\s*using\s+NUnit\.Framework'),
-                    re.compile(r'^\s*using\s+Microsoft\.VisualStudio\.TestTools'),
-                    re.compile(r'^\s*using\s+Xunit'),
-                    re.compile(r'^\s*\[Test\]'),
-                    re.compile(r'^\s*\[TestMethod\]'),
-                    re.compile(r'^\s*\[Fact\]')
-                ]
-            },
-            'dart': {
-                'test_file_ext': '.dart',
-                'regex_requirement': [
-                    re.compile(r'^\s*test\(\s*[\'"](.+?)[\'"]'),
-                    re.compile(r'^\s*testWidgets\(\s*[\'"](.+?)[\'"]'),
-                    re.compile(r'^\s*blocTest<.+?>\s*\(\s*[\'"](.+?)[\'"]')
-                ],
-                'regex_test_step': re.compile(r'\s*//\s*(S\d+:\s*.+)'),
-                'regex_test_ver': re.compile(r'\s*//\s*(V\d+:\s*.+)'),
-                'requirement_group': 1,
-                'test_import_patterns': [
-                    re.compile(r'^\s*import\s+[\'"]package:test/test\.dart[\'"]'),
-                    re.compile(r'^\s*import\s+[\'"]package:flutter_test/flutter_test\.dart[\'"]'),
-                    re.compile(r'^\s*import\s+[\'"]package:mockito/mockito\.dart[\'"]'),
-                    re.compile(r'^\s*import\s+[\'"]package:bloc_test/bloc_test\.dart[\'"]'),
-                    re.compile(r'^\s*test\s*\('),
-                    re.compile(r'^\s*group\s*\('),
-                    re.compile(r'^\s*testWidgets\s*\('),
-                    re.compile(r'^\s*blocTest\s*<')
-                ]
-            }
-        }
-        
-        if language.lower() not in language_configs:
-            raise Exception(f"Unsupported language: {language}. Supported languages: {', '.join(language_configs.keys())}")
-        
-        return language_configs[language.lower()]
+        return self.language_registry.get(language)
 
     def create_documentation_from_tests(self, repo_name, repo_config):
         """Generic method to create documentation for any language based on section configuration"""
@@ -399,17 +1957,24 @@ class CreateFDADocumentation:
         ver_template_path = repo_config.get('ver_template_path', '')
         req_output_name = repo_config.get('req_output_name', '')
         ver_output_name = repo_config.get('ver_output_name', '')
+        outputs = repo_config.get('outputs', ['docx'])
+        if isinstance(outputs, str):
+            outputs = [outputs]
+        unknown_outputs = [output for output in outputs if output not in OUTPUT_BACKENDS]
+        if unknown_outputs:
+            raise Exception(f"Unsupported outputs {', '.join(map(str, unknown_outputs))} for repo '{repo_name}'. Supported outputs: {', '.join(OUTPUT_BACKENDS)}")
         # if any of the required fields are missing, raise an exception. Allow output of all missing fields
         error_msg = []
         if not tag:
             error_msg.append(f"No tag specified for repo '{repo_name}'. Tag is required in config.")
-        if not req_template_path:
+        # the templates and document names are only needed for the .docx documents
+        if 'docx' in outputs and not req_template_path:
             error_msg.append(f"No req_template_path specified for repo '{repo_name}'. Template is required in config.")
-        if not ver_template_path:
+        if 'docx' in outputs and not ver_template_path:
             error_msg.append(f"No ver_template_path specified for repo '{repo_name}'. Template is required in config.")
-        if not req_output_name:
+        if 'docx' in outputs and not req_output_name:
             error_msg.append(f"No req_output_name specified for repo '{repo_name}'. Output name is required in config.")
-        if not ver_output_name:
+        if 'docx' in outputs and not ver_output_name:
             error_msg.append(f"No ver_output_name specified for repo '{repo_name}'. Output name is required in config.")
         if len(error_msg) > 0:
             print("Skipping section due to missing configurations:")
@@ -432,8 +1997,27 @@ class CreateFDADocumentation:
                 print(f"  - {msg}")
             return
             
-        # Find test files by searching the repository for files with testing imports
-        test_files = self.get_test_files_for_language(repo_path, language)
+        if self.merge_shards:
+            # the shards were parsed by other runs (--shard i/N), in candidate file order
+            test_files, requirements = ShardFile.merge(self.shard_dir, repo_name)
+        else:
+            # Find test files by searching the repository (or its git_ref commit) for files with testing imports, parsing them in the same pass
+            with self.open_git_tree(repo_config) as git_tree:
+                candidate_files = self.get_candidate_files_for_language(
+                    repo_path,
+                    language,
+                    include=repo_config.get('include'),
+                    exclude=repo_config.get('exclude'),
+                    use_git_index=repo_config.get('use_git_index', False),
+                    git_tree=git_tree
+                )
+                if self.shard:
+                    return self.create_shard(repo_name, repo_path, lang_config, candidate_files, git_tree)
+                cache = self.get_parse_cache(self.get_cache_name(repo_name, git_tree), lang_config)
+                orphans = []
+                test_files, requirements = self.scan_test_files(candidate_files, lang_config, cache, orphans, git_tree)
+            # the orphans come from the scan entries, so files taken from the parse cache report them too
+            self.print_orphans(orphans)
         
         if not test_files:
             print(f"  Warning: No test files found for {language} in {repo_path}")
@@ -442,7 +2026,7 @@ class CreateFDADocumentation:
         print(f"  Found {len(test_files)} test files for {language}")
         
         # Create documentation using the generic method
-        self.create_documentation(
+        return self.create_documentation(
             test_files=test_files,
             lang_config=lang_config,
             sections=sections,
@@ -450,66 +2034,427 @@ class CreateFDADocumentation:
             template_req_doc_path=repo_config.get('req_template_path'),
             template_ver_doc_path=repo_config.get('ver_template_path'),
             output_req_doc_path=repo_config.get('req_output_name'),
-            output_ver_doc_path=repo_config.get('ver_output_name')
+            output_ver_doc_path=repo_config.get('ver_output_name'),
+            requirements=requirements,
+            backends=self.get_output_backends(repo_name, repo_config, outputs),
+            repo_name=repo_name
         )
+
+    def get_output_backends(self, repo_name, repo_config, outputs):
+        """Returns the output backends of a repo. The traceability files are named <repo_name>-traceability.<ext> and
+        written to the repo's output_dir, by default the Outputs folder of its templates (or of the config file)."""
+        output_dir = repo_config.get('output_dir')
+        if not output_dir:
+            template_path = repo_config.get('req_template_path') or self.config_file_path or 'config.yaml'
+            output_dir = os.path.join(os.path.dirname(template_path), 'Outputs')
+        backends = []
+        for output in outputs:
+            if output == 'docx':
+                backends.append(DocxBackend(repo_config.get('req_template_path'), repo_config.get('ver_template_path'),
+                                            repo_config.get('req_output_name'), repo_config.get('ver_output_name')))
+            else:
+                backend = OUTPUT_BACKENDS[output]
+                backends.append(backend(os.path.join(output_dir, f"{repo_name}-traceability{backend.EXTENSION}")))
+        return backends
     
-    def create_all_documentation(self):
-        """Automatically create documentation for all configured sections"""
+    def get_parse_cache(self, cache_name, lang_config):
+        """Returns the parse cache cache_name, or None without use_cache. In watch mode the cache is kept in memory between runs."""
+        if not self.use_cache:
+            return None
+        if self.parse_caches is None:
+            return ParseCache(self.cache_dir, cache_name, lang_config)
+        cache = self.parse_caches.get(cache_name)
+        # a changed language config (the config file was edited) makes every entry invalid
+        if cache is None or cache.lang_hash != ParseCache.get_lang_config_hash(lang_config):
+            cache = self.parse_caches[cache_name] = ParseCache(self.cache_dir, cache_name, lang_config)
+        cache.hits = 0
+        return cache
+
+    def open_git_tree(self, repo_config):
+        """Returns a GitTree of the repo's git_ref to use as a context manager, or a null context if it has none"""
+        git_ref = repo_config.get('git_ref')
+        if not git_ref:
+            return contextlib.nullcontext()
+        return GitTree(repo_config.get('repo_path', ''), str(git_ref))
+
+    def get_cache_name(self, repo_name, git_tree=None):
+        # files read from git are cached by blob id, separately from the files of the working tree
+        return f"{repo_name}.git" if git_tree else repo_name
+
+    def create_shard(self, repo_name, repo_path, lang_config, candidate_files, git_tree=None):
+        """Parses the candidate files of this run's shard and writes them to the shard directory, nothing is rendered"""
+        shard_index, shard_count = self.shard
+        rel_paths = [os.path.relpath(file_path, repo_path).replace(os.sep, '/') for file_path in candidate_files]
+        indexes = {file_path: i for i, file_path in enumerate(candidate_files)}
+        shard_files = [file_path for file_path, rel_path in zip(candidate_files, rel_paths) if ShardFile.shard_of(rel_path, shard_count) == shard_index]
+        # every shard keeps its own parse cache, so the shards do not evict each other's entries
+        cache = self.get_parse_cache(f"{self.get_cache_name(repo_name, git_tree)}.{shard_index}-of-{shard_count}", lang_config)
+        orphans = []
+        test_files, requirements = self.scan_test_files(shard_files, lang_config, cache, orphans, git_tree)
+        self.print_orphans(orphans)
+        shard_path = ShardFile.write(self.shard_dir, repo_name, shard_index, shard_count, rel_paths, test_files, requirements, indexes)
+        # shards of an earlier run with another shard count would only be in the way of the merge
+        ShardFile.remove_other_counts(self.shard_dir, repo_name, shard_count)
+        print(f"  Wrote {len(requirements)} requirements from {len(test_files)} of {len(candidate_files)} candidate files to {shard_path}")
+        return []
+
+    def get_repos(self):
+        """Returns (repo_name, repo_config) of every configured repo that has a language"""
+        repos = []
         for repo_name, repo_config in self.config.items():
-            if not isinstance(repo_config, dict):
+            # 'languages' holds user-defined language specs, not a repo
+            if not isinstance(repo_config, dict) or repo_name == 'languages':
                 continue
-            
-            language = repo_config.get('language', '').lower()
-            
-            if language:
+            if repo_config.get('language', ''):
+                repos.append((repo_name, repo_config))
+            else:
+                print(f"Warning: No language specified for section '{repo_name}'. Skipping.")
+        return repos
+
+    def check_all_repos(self):
+        """Scans all configured repos for the problems create_documentation would warn about, without creating any documents.
+        Returns a CheckReport"""
+        report = CheckReport()
+        self.listing_cache = DirectoryListingCache()
+        try:
+            for repo_name, repo_config in self.get_repos():
+                start = time.perf_counter()
                 try:
-                    print(f"Creating {language.capitalize()} documentation for section: {repo_name}")
-                    self.create_documentation_from_tests(repo_name, repo_config)
+                    print(f"Checking {repo_config.get('language', '').capitalize()} tests for section: {repo_name}")
+                    self.check_repo(repo_name, repo_config, report)
+                    error = None
                 except Exception as e:
-                    print(f"Error creating documentation for section '{repo_name}': {e}")
+                    print(f"Error checking section '{repo_name}': {e}")
+                    error = str(e)
+                report.repos.append({'name': repo_name, 'status': 'failed' if error else 'ok', 'seconds': time.perf_counter() - start, 'error': error})
+        finally:
+            self.listing_cache = None
+        return report
+
+    def check_repo(self, repo_name, repo_config, report):
+        """Adds the findings of one repo to report, templates and outputs are not needed"""
+        language = repo_config.get('language', '').lower()
+        repo_path = repo_config.get('repo_path', '')
+        if not repo_path:
+            raise Exception(f"No repo_path specified for repo '{repo_name}'. Repository path is required in config.")
+        lang_config = self.get_language_config(language)
+        sections = self.get_sections_for_repo(repo_name)
+        orphans = []
+        with self.open_git_tree(repo_config) as git_tree:
+            candidate_files = self.get_candidate_files_for_language(repo_path, language, include=repo_config.get('include'),
+                exclude=repo_config.get('exclude'), use_git_index=repo_config.get('use_git_index', False), git_tree=git_tree)
+            cache = self.get_parse_cache(self.get_cache_name(repo_name, git_tree), lang_config)
+            test_files, requirements = self.scan_test_files(candidate_files, lang_config, cache, orphans, git_tree)
+        print(f"  Found {len(requirements)} requirements in {len(test_files)} test files for {language}")
+        for orphan in orphans:
+            report.check_orphan(repo_name, *orphan)
+        # the same stage as before rendering, requirements in the Ignore section are not documented, so they are not checked either
+        self.classify_requirements(requirements, sections)
+        RequirementPostProcessor(repo_name, report).process(sections)
+
+    def iter_requirements(self, repo_config, include_ignored=False):
+        """Lazily yields (section name, Requirement) for every requirement of one repo, see the module's iter_requirements()"""
+        language = repo_config.get('language', '').lower()
+        if not language:
+            raise Exception("No language specified in repo config")
+        repo_path = repo_config.get('repo_path', '')
+        if not repo_path:
+            raise Exception("No repo_path specified in repo config")
+        lang_config = self.get_language_config(language)
+        sections = self.get_sections_from_config(repo_config)
+        with self.open_git_tree(repo_config) as git_tree:
+            candidate_files = self.get_candidate_files_for_language(repo_path, language, include=repo_config.get('include'),
+                exclude=repo_config.get('exclude'), use_git_index=repo_config.get('use_git_index', False), git_tree=git_tree)
+            # one file is read, parsed and classified at a time, as the consumer asks for its requirements
+            for file_path, entry in zip(candidate_files, self.scan_files(candidate_files, lang_config, git_tree=git_tree)):
+                if entry is None or not entry['is_test_file'] or not entry['requirements']:
+                    continue
+                section = sections.classifier.classify(file_path, os.path.basename(file_path))
+                if section.name == 'Ignore' and not include_ignored:
+                    continue
+                for req in entry['requirements']:
+                    # in V tag order, as in the verification document
+                    RequirementPostProcessor.sort_verifications(req)
+                    yield section.name, req
+
+    def create_all_documentation(self, repos=None):
+        """Automatically create documentation for all configured sections, or only for the given (repo_name, repo_config)"""
+        if repos is None:
+            repos = self.get_repos()
+        self.skipped_outputs = []
+
+        # repos with the same or nested repo_path read every directory only once
+        self.listing_cache = DirectoryListingCache()
+        # with jobs > 1 the documents of all repos are rendered in a process pool while the next repos are being scanned,
+        # the files of all repos are scanned in one more pool, created before the repo threads start. Watch mode keeps
+        # its own pools alive between regenerations
+        own_pool = self.jobs > 1 and self.render_pool is None
+        if own_pool:
+            self.render_pool = self.create_pool()
+            self.scan_pool = self.create_pool()
+        try:
+            if self.repo_jobs > 1 and len(repos) > 1:
+                with ThreadPoolExecutor(max_workers=self.repo_jobs) as executor:
+                    runs = list(executor.map(lambda repo: self.run_repo(*repo), repos))
             else:
-                print(f"Warning: No language specified for section '{repo_name}'. Skipping.")
+                runs = [self.run_repo(repo_name, repo_config) for repo_name, repo_config in repos]
+            results = [self.finish_repo(*run) for run in runs]
+        finally:
+            if own_pool:
+                self.render_pool.shutdown()
+                self.render_pool = None
+                self.scan_pool.shutdown()
+                self.scan_pool = None
+            self.listing_cache = None
+
+        print("Summary:")
+        for repo_name, status, seconds, error in results:
+            print(f"  {repo_name}: {status} ({seconds:.1f}s)" + (f" - {error}" if error else ''))
+        if self.skipped_outputs:
+            print(f"Skipped {len(self.skipped_outputs)} unchanged documents (use --force to render them anyway):")
+            for output_path in self.skipped_outputs:
+                print(f"  {output_path}")
+        if self.metrics is not None:
+            self.metrics.repos = [{'name': repo_name, 'status': status, 'seconds': seconds, 'error': str(error) if error else None}
+                                  for repo_name, status, seconds, error in results]
         pass
 
-    def create_documentation(self, test_files, lang_config, sections, tag, template_req_doc_path, template_ver_doc_path, output_req_doc_path, output_ver_doc_path):
-        # Parse requirements from all test files
-        requirements = []
-        for test_file in test_files:
-            print(f"Processing test file: {os.path.basename(test_file)}", end='\r')
-            new_reqs = self.parse_file_for_requirements(
-                test_file, 
-                lang_config['regex_requirement'], 
-                lang_config['regex_test_step'], 
-                lang_config['regex_test_ver'], 
-                lang_config['requirement_group']
-            )
-            requirements += new_reqs
-        print(f"Found {len(requirements)} requirements from {len(test_files)} test files.")
-        for req in requirements:
-            section = self.get_section_for_requirement(req, sections)
-            section.requirements.append(req)
-        # Do some cleanup of the requirements based on certain parameters    
+    def watch(self, interval=1.0, debounce=0.5):
+        """Creates the documents of all repos, then polls their files and regenerates the documents of every repo whose
+        test files or templates changed, until interrupted. Changes are collected until the files have not changed for
+        debounce seconds, so a burst of saves causes one regeneration. The config, language specs, parsed templates and
+        parse results stay in memory, so only the changed files are parsed again."""
+        self.parse_caches = {}
+        if self.jobs > 1:
+            # the workers keep their parsed templates between regenerations, Ctrl+C only stops the main process
+            self.render_pool = self.create_pool(initializer=signal.signal, initargs=(signal.SIGINT, signal.SIG_IGN))
+            self.scan_pool = self.create_pool(initializer=signal.signal, initargs=(signal.SIGINT, signal.SIG_IGN))
+        try:
+            repos = self.get_repos()
+            config_state = self.get_file_state(self.config_file_path)
+            snapshots = self.snapshot_repos(repos)
+            self.create_all_documentation(repos)
+            print(f"Watching {len(repos)} repos for changes, press Ctrl+C to stop...")
+            # the state of a config file that could not be loaded, it is not tried again until it changes
+            failed_config_state = None
+            while True:
+                time.sleep(interval)
+                changed_repos = self.wait_for_changes(repos, snapshots, debounce)
+                new_config_state = self.get_file_state(self.config_file_path)
+                if new_config_state != config_state and new_config_state != failed_config_state:
+                    # everything read from the config is read again, which may add or remove repos
+                    print(f"{self.config_file_path} changed, regenerating all repos")
+                    previous = {attribute: self.__dict__.pop(attribute) for attribute in ['_config', '_language_registry'] if attribute in self.__dict__}
+                    try:
+                        new_repos = self.get_repos()
+                        new_snapshots = self.snapshot_repos(new_repos)
+                    except Exception as e:
+                        # e.g. a half-saved edit, the repos keep being watched with the config that was loaded last
+                        print(f"Error reloading {self.config_file_path}, keeping the previous config: {e}")
+                        self.__dict__.update(previous)
+                        failed_config_state = new_config_state
+                    else:
+                        repos, snapshots = new_repos, new_snapshots
+                        config_state = new_config_state
+                        failed_config_state = None
+                        changed_repos = repos
+                if changed_repos:
+                    print(f"Changes in {', '.join(repo_name for repo_name, _ in changed_repos)}, regenerating...")
+                    self.create_all_documentation(changed_repos)
+        except KeyboardInterrupt:
+            print("Stopped watching")
+        finally:
+            if self.render_pool:
+                self.render_pool.shutdown()
+                self.render_pool = None
+                self.scan_pool.shutdown()
+                self.scan_pool = None
+            self.parse_caches = None
+
+    def wait_for_changes(self, repos, snapshots, debounce):
+        """Returns the repos whose snapshot differs from snapshots, once they stopped changing for debounce seconds.
+        snapshots is updated to the new state."""
+        changed = set()
+        while True:
+            latest = self.snapshot_repos(repos)
+            new_changes = {repo_name for repo_name, snapshot in latest.items() if snapshot != snapshots.get(repo_name)}
+            snapshots.update(latest)
+            if not new_changes:
+                break
+            changed |= new_changes
+            time.sleep(debounce)
+        return [repo for repo in repos if repo[0] in changed]
+
+    def snapshot_repos(self, repos):
+        """Returns {repo_name: {path: (mtime, size)}} of the candidate files and templates of every repo"""
+        # one fresh set of directory listings per poll, shared by all repos
+        listing_cache = DirectoryListingCache()
+        snapshots = {}
+        for repo_name, repo_config in repos:
+            paths = [repo_config.get('req_template_path', ''), repo_config.get('ver_template_path', '')]
+            try:
+                ext = self.get_language_config(repo_config.get('language', '').lower())['test_file_ext']
+                # the files of a git_ref commit do not change, only its templates are watched
+                if repo_config.get('repo_path') and not repo_config.get('git_ref'):
+                    discovery = FileDiscovery(ext, repo_config.get('include'), repo_config.get('exclude'), self.jobs, listing_cache)
+                    paths += discovery.walk(repo_config['repo_path'])
+            except Exception:
+                # the error is reported when the repo is (re)generated
+                pass
+            snapshots[repo_name] = {path: self.get_file_state(path) for path in paths if path}
+        return snapshots
+
+    @staticmethod
+    def get_file_state(file_path):
+        """Returns (mtime, size) of file_path, None if it does not exist"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def run_repo(self, repo_name, repo_config):
+        """Scans one repo and starts rendering its documents, errors are reported and kept to this repo.
+        Returns (repo_name, render futures or None if skipped, start and end time, error)"""
+        start = time.perf_counter()
+        language = repo_config.get('language', '').lower()
+        try:
+            print(f"Creating {language.capitalize()} documentation for section: {repo_name}")
+            futures = self.create_documentation_from_tests(repo_name, repo_config)
+            return repo_name, futures, start, time.perf_counter(), None
+        except Exception as e:
+            print(f"Error creating documentation for section '{repo_name}': {e}")
+            return repo_name, None, start, time.perf_counter(), e
+
+    def finish_repo(self, repo_name, futures, start, end, error):
+        """Waits for the documents of one repo still rendering in the pool, returns (repo_name, status, seconds, error)"""
+        pending = [future for future in futures or [] if future is not None]
+        if error is None and pending:
+            try:
+                for future in pending:
+                    phases = future.result()
+                    if phases:
+                        self.metrics.merge_phases(phases)
+            except Exception as e:
+                print(f"Error creating documentation for section '{repo_name}': {e}")
+                error = e
+            end = max(end, time.perf_counter())
+        status = 'failed' if error is not None else ('ok' if futures is not None else 'skipped')
+        return repo_name, status, end - start, error
+
+    def render(self, function, sections, tag, docx_path, output_docx_name):
+        """Calls function(sections, tag, docx_path, output_docx_name) in the render pool if there is one and returns its future,
+        otherwise calls it right away. Nothing is rendered if the output manifest shows the document is up to date."""
+        output_path = self.get_output_path(docx_path, output_docx_name)
+        manifest = self.get_output_manifest(os.path.dirname(output_path))
+        digest = self.get_output_digest(function.__name__, sections, tag, docx_path)
+        if not self.force and manifest.is_current(output_path, digest):
+            print(f"Skipped unchanged document: {output_path}")
+            self.skipped_outputs.append(output_path)
+            return None
+        if self.render_pool is None:
+            function(sections, tag, docx_path, output_docx_name)
+            manifest.record(output_path, digest)
+            return None
+        future = self.render_pool.submit(self.call_with_metrics, function.__name__, sections, tag, docx_path, output_docx_name)
+        def record(future):
+            # the manifest is only written by the main process, once the worker saved the document
+            if future.exception() is None:
+                manifest.record(output_path, digest)
+        future.add_done_callback(record)
+        return future
+
+    def get_output_manifest(self, outputs_dir):
+        """Returns the manifest of outputs_dir, read once per run"""
+        key = os.path.abspath(outputs_dir)
+        with self.manifests_lock:
+            if key not in self.manifests:
+                self.manifests[key] = OutputManifest(outputs_dir)
+            return self.manifests[key]
+
+    def get_output_digest(self, function_name, sections, tag, docx_path):
+        """Returns the digest of everything the document rendered by function_name depends on: the numbered requirements of
+        every section but Ignore (with their steps and verifications for the verification document), the tag, the template
+        bytes, the debug flag and the version of this script"""
+        with_tests = function_name == 'create_verification_document'
+        digest = hashlib.sha1()
+        def add(*values):
+            for value in values:
+                digest.update(str(value).encode('utf-8', errors='surrogateescape'))
+                digest.update(b'\0')
+        add(OutputManifest.generator_digest(), function_name, tag, self.debug_print, OutputManifest.file_digest(docx_path))
         for section in sections:
             if section.name == 'Ignore':
                 continue
+            add('section', section.name, len(section.requirements))
             for req in section.requirements:
-                # Remove requirements that have no verification steps, and report them
-                if len(req.test_verifications) == 0:
-                    print(f"  Warning: No verifications in '{os.path.basename(req.test_file_path)}:{req.test_file_line}' - '{req.req_orig_text}'")
-                    section.requirements.remove(req)
-                # Go through the test verifications and sort them based on number in the the V\d+ tag
-                req.test_verifications.sort(key=lambda x: int(x.split(':')[0][1:]))
-        
-        self.create_requirements_document(sections, tag, template_req_doc_path, output_req_doc_path)
-        self.create_verification_document(sections, tag, template_ver_doc_path, output_ver_doc_path)
+                add(req.req_num, req.req_text)
+                if with_tests:
+                    add(len(req.test_steps), *req.test_steps, len(req.test_verifications), *req.test_verifications)
+                if self.debug_print:
+                    add(os.path.basename(req.test_file_path), req.test_file_line)
+        return digest.hexdigest()
+
+    def call_with_metrics(self, function_name, *args):
+        """Runs a render in a pool worker, returns the phase times it measured there (if metrics are enabled)"""
+        getattr(self, function_name)(*args)
+        return self.metrics.phases if self.metrics is not None else None
+
+    def assign_requirement_numbers(self, sections):
+        """Numbers the requirements of all sections but Ignore in document order, the DO numbers of both documents"""
+        req_num = 0
+        for section in sections:
+            if section.name == 'Ignore':
+                continue
+            for req in section.requirements:
+                req_num += 1
+                req.req_num = req_num
+
+    def classify_requirements(self, requirements, sections):
+        """Appends every requirement to the requirements of its section"""
+        # requirements of one test file are consecutive, so classify each file once
+        test_file, section = None, None
+        for req in requirements:
+            if req.test_file is not test_file:
+                test_file = req.test_file
+                section = self.get_section_for_requirement(req, sections)
+            section.requirements.append(req)
+
+    def create_documentation(self, test_files, lang_config, sections, tag, template_req_doc_path, template_ver_doc_path, output_req_doc_path, output_ver_doc_path, requirements=None, backends=None, repo_name=None):
+        # Parse requirements from all test files, unless they were already parsed while scanning for test files
+        if requirements is None:
+            requirements = self.scan_test_files(test_files, lang_config)[1]
+        print(f"Found {len(requirements)} requirements from {len(test_files)} test files.")
+        if not isinstance(sections, SectionList):
+            sections = SectionList(sections)
+        with self.phase('classification'):
+            self.classify_requirements(requirements, sections)
+        # leave out requirements without verifications, sort the verifications and report what --check would find
+        with self.phase('postprocess'):
+            report = RequirementPostProcessor(repo_name or tag).process(sections)
+        for finding in report.findings:
+            print(f"  Warning: {os.path.basename(finding['file'])}:{finding['line']} - {finding['message']}")
+
+        # both documents refer to the DO numbers, so they are assigned before either is rendered
+        self.assign_requirement_numbers(sections)
+        # by default only the .docx documents are created
+        if backends is None:
+            backends = [DocxBackend(template_req_doc_path, template_ver_doc_path, output_req_doc_path, output_ver_doc_path)]
+        futures = []
+        for backend in backends:
+            futures += backend.write(self, sections, tag)
+        return futures
 
     def get_sections_for_repo(self, repo_name):
         config_repo = self.config.get(repo_name)    
         if not config_repo:
             raise Exception(f"Error: config.yaml file does not contain a section for '{repo_name}'")
-        
+        return self.get_sections_from_config(config_repo)
+
+    def get_sections_from_config(self, config_repo):
+        """Returns the sections of a repo config, followed by Ignore (if it has an ignore list) and Miscellaneous"""
         sections_list = config_repo.get('sections', [])
-        sections = []
+        sections = SectionList()
         
         for section_dict in sections_list:
             section = Section()
@@ -533,17 +2478,13 @@ class CreateFDADocumentation:
         return sections
     
     def get_section_for_requirement(self, req, sections):
-        misc_section = None
-        for section in sections:
-            if section.path_key != '' and section.path_key not in req.test_file_path:
-                continue
-            if req.test_filename in section.filenames:
-                return section
-            if section.name == 'Miscellaneous':
-                misc_section = section
-        return misc_section
+        if not isinstance(sections, SectionList):
+            sections = SectionList(sections)
+        return sections.classifier.classify(req.test_file_path, req.test_filename)
 
     def get_tag_style(self, document):
+        from docx.shared import RGBColor
+        from docx.enum.style import WD_STYLE_TYPE
         style2 = document.styles['Heading 2']
         try:
             style = document.styles['tag_font']
@@ -558,140 +2499,226 @@ class CreateFDADocumentation:
         return style
 
     def create_requirements_document(self, sections, tag, docx_path, output_docx_name):
-        document = Document(docx_path)
-        style2 = document.styles['Heading 2']
-        tag_style = self.get_tag_style(document)
-        # for each section in the dictionary, create a new section in the document with a style of Heading 1, and each requirement in that section with a style of Heading 2
-        req_num = 0
-        for section in sections:
-            if section.name == 'Ignore':
-                continue
-            if len(section.requirements) == 0:
-                continue
-            document.add_heading(section.name, level=1)
-            for req in section.requirements:
-                req_num += 1
-                req.req_num = req_num
-                p = document.add_paragraph()
-                p.style = style2
-                run1 = p.add_run(f"{tag}:DO:{req_num}")
-                p.add_run(f" {req.req_text}")
-                if self.debug_print:
-                    p = p.add_run(f" ({os.path.basename(req.test_file_path)}:{req.test_file_line})")
-                    p.italic = True
-                run1.style = tag_style
-                run1.bold = True
+        writer = None
+        try:
+            with self.phase('srs_render'):
+                document = TEMPLATE_CACHE.get(docx_path, self.get_tag_style)
+                style2 = document.styles['Heading 2']
+                tag_style = self.get_tag_style(document)
+                writer = DocxStreamWriter(document, self.get_output_path(docx_path, output_docx_name)) if self.stream_output else None
+                # for each section in the dictionary, create a new section in the document with a style of Heading 1, and each requirement in that section with a style of Heading 2
+                # (the requirements are numbered by assign_requirement_numbers() beforehand)
+                for section in sections:
+                    if section.name == 'Ignore':
+                        continue
+                    if len(section.requirements) == 0:
+                        continue
+                    document.add_heading(section.name, level=1)
+                    for req in section.requirements:
+                        p = document.add_paragraph()
+                        p.style = style2
+                        run1 = p.add_run(f"{tag}:DO:{req.req_num}")
+                        p.add_run(f" {req.req_text}")
+                        if self.debug_print:
+                            p = p.add_run(f" ({os.path.basename(req.test_file_path)}:{req.test_file_line})")
+                            p.italic = True
+                        run1.style = tag_style
+                        run1.bold = True
+                    if writer:
+                        writer.flush()
         
+            with self.phase('save'):
+                if writer:
+                    writer.close()
+                    filename = writer.filename
+                else:
+                    filename = self.get_output_path(docx_path, output_docx_name)
+                    document.save(filename)
+        finally:
+            if writer:
+                # a failed render leaves the previous document in place, not a truncated one
+                writer.abort()
+        print(f"Saved requirements document: {filename}")
+        pass
+
+    def get_output_path(self, docx_path, output_docx_name):
         # Create Outputs directory if it doesn't exist
         dirname = os.path.dirname(docx_path)
         outputs_dir = os.path.join(dirname, 'Outputs')
         if not os.path.exists(outputs_dir):
-            os.makedirs(outputs_dir)
+            # documents may be rendered concurrently, so another worker may have just created it
+            os.makedirs(outputs_dir, exist_ok=True)
             print(f"Created Outputs directory: {outputs_dir}")
         
-        filename = os.path.join(outputs_dir, output_docx_name)
-        document.save(filename)
-        print(f"Saved requirements document: {filename}")
-        pass
+        return os.path.join(outputs_dir, output_docx_name)
 
     def create_verification_document(self, sections, tag, docx_path, output_docx_name):
-        document = Document(docx_path)
-        # Get the paragraph with the text "Test Steps", if the style does not exist, create it
-        test_step_num_style = document.styles['Normal']
-        tag_style = self.get_tag_style(document)
-        p = document.add_paragraph()
-        p.style = document.styles['Heading 1']
-        p.add_run("Verification Test Protocol")
-        ver_num = 1
-        ver_step_num = 1
-        # get the last table
-        table = document.tables[-1]
-        # make a deep copy of the table
-        copied_table_tbl = deepcopy(table._tbl)
-        # Find the paragraph just before the last table
-        first_section_paragraph = None
-        for element in document.element.body:
-            if element.tag.endswith('tbl') and element == table._tbl:
-                # Found the table, get the previous element
-                prev_element = element.getprevious()
+        from docx.table import Table
+        from docx.text.paragraph import Paragraph
+        writer = None
+        try:
+            with self.phase('verification_render'):
+                document = TEMPLATE_CACHE.get(docx_path, self.get_tag_style)
+                # Get the paragraph with the text "Test Steps", if the style does not exist, create it
+                test_step_num_style = document.styles['Normal']
+                tag_style = self.get_tag_style(document)
+                p = document.add_paragraph()
+                p.style = document.styles['Heading 1']
+                p.add_run("Verification Test Protocol")
+                ver_num = 1
+                ver_step_num = 1
+                # get the last table
+                table = document.tables[-1]
+                # make a deep copy of the table
+                copied_table_tbl = deepcopy(table._tbl)
+                # Find the paragraph just before the last table
+                first_section_paragraph = None
+                prev_element = table._tbl.getprevious()
                 if prev_element is not None and prev_element.tag.endswith('p'):
-                    # Find the corresponding paragraph object
-                    for para in document.paragraphs:
-                        if para._element == prev_element:
-                            first_section_paragraph = para
-                            break
-                break
+                    first_section_paragraph = Paragraph(prev_element, document._body)
+                table_writer = VerificationTableWriter(document, tag, test_step_num_style, tag_style, self.debug_print)
+                writer = DocxStreamWriter(document, self.get_output_path(docx_path, output_docx_name)) if self.stream_output else None
         
-        for table_i, section in enumerate(sections):
-            if section.name == 'Ignore':
-                continue
-            if len(section.requirements) == 0:
-                print(f"  Warning: No requirements in section '{section.name}' for tag '{tag}'. Skipping section.")
-                continue
+                for table_i, section in enumerate(sections):
+                    if section.name == 'Ignore':
+                        continue
+                    if len(section.requirements) == 0:
+                        print(f"  Warning: No requirements in section '{section.name}' for tag '{tag}'. Skipping section.")
+                        continue
             
-            if table_i == 0 and first_section_paragraph is not None:
-                # Use the existing paragraph before the table for the first section
-                p = first_section_paragraph
-                # Clear existing content and add new content
-                p.clear()
-            else:
-                p = document.add_paragraph()
-            p.style = document.styles['Heading 2']
-            run = p.add_run(f"{tag}:VER:{ver_num} ")
-            run.style = tag_style
-            run.bold = True
-            p.add_run(section.name)
-            if table_i > 0:
-                # Create a new table from the copied XML element and insert it
-                new_table_tbl = deepcopy(copied_table_tbl)
-                p._p.addnext(new_table_tbl)
-                # Get the newly added table from the document's tables collection
-                table = document.tables[-1]  # The newly added table will be the last one
-            # ensure that the table has sufficient rows for all the requirements (keeping in mind that the copied table already has a header row and an empty first row)
-            for i in range(len(section.requirements) - 1):
-                table.add_row()
-            for i, req in enumerate(section.requirements):
-                cells = table.rows[i + 1].cells
-                cells[0].text = f"{ver_step_num}."
-                ver_step_num += 1
-                cells[0].paragraphs[0].style = test_step_num_style
-                cells[1].text = '\n'.join(req.test_steps)
-                cells[2].text = '\n'.join(req.test_verifications)
-                p = cells[2].add_paragraph()
-                run = p.add_run(f"[{tag}:DO:{req.req_num}]")
-                run.style = tag_style
-                run.bold = True
-                if self.debug_print:
-                    p = cells[2].add_paragraph()
-                    p.text = f"({os.path.basename(req.test_file_path)}:{req.test_file_line})"
-                    p.italic = True
-            ver_num += 1
-        
-        # Create Outputs directory if it doesn't exist
-        dirname = os.path.dirname(docx_path)
-        outputs_dir = os.path.join(dirname, 'Outputs')
-        if not os.path.exists(outputs_dir):
-            os.makedirs(outputs_dir)
-            print(f"Created Outputs directory: {outputs_dir}")
+                    if table_i == 0 and first_section_paragraph is not None:
+                        # Use the existing paragraph before the table for the first section
+                        p = first_section_paragraph
+                        # Clear existing content and add new content
+                        p.clear()
+                    else:
+                        p = document.add_paragraph()
+                    p.style = document.styles['Heading 2']
+                    run = p.add_run(f"{tag}:VER:{ver_num} ")
+                    run.style = tag_style
+                    run.bold = True
+                    p.add_run(section.name)
+                    if table_i > 0:
+                        # Create a new table from the copied XML element and insert it
+                        new_table_tbl = deepcopy(copied_table_tbl)
+                        p._p.addnext(new_table_tbl)
+                        table = Table(new_table_tbl, document._body)
+                    # fill the table (which already has a header row and an empty first row) with one row per requirement
+                    ver_step_num = table_writer.fill(table, section.requirements, ver_step_num)
+                    ver_num += 1
+                    if writer:
+                        writer.flush()
         
-        filename = os.path.join(outputs_dir, output_docx_name)
-        document.save(filename)
+            with self.phase('save'):
+                if writer:
+                    writer.close()
+                    filename = writer.filename
+                else:
+                    filename = self.get_output_path(docx_path, output_docx_name)
+                    document.save(filename)
+        finally:
+            if writer:
+                # a failed render leaves the previous document in place, not a truncated one
+                writer.abort()
         print(f"Saved verification document: {filename}")
         pass
 
 
+def iter_requirements(repo_config, config_file_path=None, jobs=1, include_ignored=False):
+    """Library entry point: lazily yields (section name, Requirement) for every requirement of the repo described by
+    repo_config (a dict with the keys of one repo in config.yaml, only language and repo_path are required).
+
+    The test files are discovered, parsed, normalized and classified one file at a time while the generator is consumed,
+    in candidate file order, so memory use does not grow with the size of the repo (with jobs > 1 the files are parsed
+    ahead in worker processes). Nothing is printed or written, python-docx is not imported and no parse cache is used.
+    Requirements get no DO number (req_num stays 0) since that depends on the order of all sections of a document,
+    requirements without verifications are included, and those in the ignore list only with include_ignored.
+    config_file_path is only read for its user-defined languages.
+
+        for section_name, req in iter_requirements({'language': 'golang', 'repo_path': '../golang-example'}):
+            print(section_name, req.req_text, req.test_steps, req.test_verifications)
+    """
+    fda = CreateFDADocumentation(config_file_path=config_file_path, jobs=jobs, use_cache=False, quiet=True)
+    yield from fda.iter_requirements(repo_config, include_ignored)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Create FDA documentation')
     parser.add_argument('--config', '-c', type=str, default='config.yaml', 
                        help='Path to the configuration file (default: config.yaml)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                       help='Number of worker processes used to parse test files (default: 1, 0 = one per CPU)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Parse every test file instead of reusing the results cached in .fda_cache/')
+    parser.add_argument('--repo-jobs', type=int, default=1,
+                       help='Number of repos processed at the same time (default: 1)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Write the documents section by section to bound memory use for very large repos')
+    parser.add_argument('--shard', type=str,
+                       help='Only parse shard i of N (given as i/N) of every repo and write it to the shard directory, see the merge command')
+    parser.add_argument('--shard-dir', type=str,
+                       help='Directory the shard files are written to and merged from (default: .fda_shards/ next to the config file)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Time every phase of the run and print a summary table with the slowest files and the peak memory')
+    parser.add_argument('--metrics-json', type=str,
+                       help='Write the measurements of --profile (including the time of every file) to this JSON file')
+    parser.add_argument('--profile-dump', type=str,
+                       help='Also profile the phases run in the main process with cProfile and write the slowest one to this directory')
+    parser.add_argument('--check', action='store_true',
+                       help='Only check the tests: print the problems found as JSON and exit with 1 if there are any, no documents are created')
+    parser.add_argument('--watch', action='store_true',
+                       help='Keep running and regenerate the documents of a repo whenever its test files or templates change')
+    parser.add_argument('--watch-interval', type=float, default=1.0,
+                       help='Seconds between two polls of the repos in --watch mode (default: 1.0)')
+    parser.add_argument('--watch-debounce', type=float, default=0.5,
+                       help='Seconds the files must stay unchanged before the documents are regenerated in --watch mode (default: 0.5)')
+    parser.add_argument('--force', action='store_true',
+                       help='Render every document, also those whose inputs did not change since they were last rendered')
+    subparsers = parser.add_subparsers(dest='command')
+    merge_parser = subparsers.add_parser('merge', help='Merge the shard files of all repos and create the documents')
+    merge_parser.add_argument('--shard-dir', type=str, default=argparse.SUPPRESS,
+                       help='Directory the shard files are merged from (default: .fda_shards/ next to the config file)')
     args = parser.parse_args()
+    shard = None
+    if args.shard:
+        try:
+            shard = tuple(int(value) for value in args.shard.split('/'))
+        except ValueError:
+            shard = ()
+        if len(shard) != 2 or not 0 <= shard[0] < shard[1]:
+            parser.error(f"--shard must be given as i/N with 0 <= i < N, not '{args.shard}'")
+    if shard and args.command == 'merge':
+        parser.error("--shard cannot be used with merge")
+    if args.check and (shard or args.command == 'merge'):
+        parser.error("--check cannot be used with --shard or merge")
+    if args.watch and (args.check or shard or args.command == 'merge'):
+        parser.error("--watch cannot be used with --check, --shard or merge")
+    metrics = Metrics(profile_dir=args.profile_dump) if args.profile or args.metrics_json or args.profile_dump else None
     # Create an instance of the CreateFDADocumentation class with the specified config file
-    create_fda_documentation = CreateFDADocumentation(debug_print=False, config_file_path=args.config)
+    create_fda_documentation = CreateFDADocumentation(debug_print=False, config_file_path=args.config, jobs=args.jobs, use_cache=not args.no_cache, stream_output=args.stream, repo_jobs=args.repo_jobs,
+                                                      shard=shard, merge_shards=args.command == 'merge', shard_dir=args.shard_dir, metrics=metrics,
+                                                      force=args.force)
     
-    print(f"Processing all configured sections from {args.config}...")
-    create_fda_documentation.create_all_documentation()
-
-
-
-
-
+    if args.check:
+        # progress and warnings go to stderr, so stdout only holds the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            print(f"Checking all configured sections from {args.config}...")
+            report = create_fda_documentation.check_all_repos()
+            print(f"Found {len(report.findings)} problems")
+        report.write(sys.stdout)
+    elif args.watch:
+        print(f"Processing all configured sections from {args.config}...")
+        create_fda_documentation.watch(args.watch_interval, args.watch_debounce)
+    else:
+        print(f"Processing all configured sections from {args.config}...")
+        create_fda_documentation.create_all_documentation()
+    if metrics is not None:
+        with contextlib.redirect_stdout(sys.stderr) if args.check else contextlib.nullcontext():
+            metrics.print_summary()
+            if args.metrics_json:
+                metrics.write_json(args.metrics_json)
+                print(f"Wrote metrics to {args.metrics_json}")
+            profile_path = metrics.dump_profile()
+            if profile_path:
+                print(f"Wrote the cProfile stats of the slowest phase to {profile_path} (view with: python -m pstats {profile_path})")
+    if args.check and (report.findings or any(repo['error'] for repo in report.repos)):
+        sys.exit(1)